@@ -0,0 +1,213 @@
+import asyncio
+import collections
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse
+from app.metrics import metrics
+
+# Admission settings - override with env vars
+MAX_INFLIGHT_DOCS = int(os.getenv("MAX_INFLIGHT_DOCS", "0"))           # 0 = what the OCR engine holds
+MAX_INFLIGHT_PAGES = int(os.getenv("MAX_INFLIGHT_PAGES", "64"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))   # per request, 0 = no cap
+ADMISSION_QUEUE = int(os.getenv("ADMISSION_QUEUE", "32"))            # requests allowed to wait
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", "15"))      # seconds one may wait
+
+
+class Rejected(Exception):
+    """Not admitted - `status` 429 (wait queue full) or 503 (waited past the deadline)"""
+
+    def __init__(self, status: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=self.status,
+            content={"status": "error", "message": str(self), "filled_form": {}},
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class AdmissionController:
+    """Caps documents and pages in flight; the rest wait in a bounded FIFO with a deadline"""
+
+    def __init__(self, max_docs: int = 8, max_pages: int = MAX_INFLIGHT_PAGES,
+                 queue_size: int = ADMISSION_QUEUE, timeout: float = ADMISSION_TIMEOUT):
+        self.max_docs = max(1, max_docs)
+        self.max_pages = max(1, max_pages)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.docs = 0
+        self.pages = 0
+        self.waiters = collections.deque()
+        self.service_time = 1.0   # moving average of seconds per document, for Retry-After
+        self.counters = {"admitted": 0, "queue_full": 0, "timeout": 0}
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up for a new request"""
+        ahead = len(self.waiters) + self.docs
+        return max(1, min(60, round(self.service_time * ahead / self.max_docs)))
+
+    def check(self):
+        """Fail fast when the wait queue is already full"""
+        if len(self.waiters) >= self.queue_size and not self._fits(1):
+            self._reject("queue_full", 429, "Too many requests waiting - retry later")
+
+    @asynccontextmanager
+    async def admit(self, pages: int = 1, deadline: bool = True):
+        """Hold a slot for a document of `pages` pages. `deadline=False` is for work whose
+        caller is already bounded (job workers, batch slots): it waits as long as it takes
+        and is not refused by a full wait queue."""
+        # A document bigger than the whole page budget still runs - alone
+        pages = max(1, min(pages, self.max_pages))
+        await self._acquire(pages, deadline)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.service_time = 0.8 * self.service_time + 0.2 * (time.perf_counter() - start)
+            self._release(pages)
+
+    async def _acquire(self, pages: int, deadline: bool = True):
+        if not self.waiters and self._fits(pages):
+            self._take(pages)
+            return
+        if deadline and len(self.waiters) >= self.queue_size:
+            self._reject("queue_full", 429, "Too many requests waiting - retry later")
+        granted = asyncio.get_running_loop().create_future()
+        self.waiters.append((pages, granted))
+        self._publish()
+        try:
+            await asyncio.wait({granted}, timeout=self.timeout if deadline else None)
+        except asyncio.CancelledError:
+            if granted.done():  # admitted just as the client went away
+                self._release(pages)
+            raise
+        finally:
+            if not granted.done():
+                granted.cancel()
+                self.waiters.remove((pages, granted))
+                # A big document leaving the head may unblock smaller ones behind it
+                self._wake()
+        if granted.cancelled():
+            self._reject("timeout", 503, f"Server busy - not admitted within {self.timeout:g}s")
+
+    def _fits(self, pages: int) -> bool:
+        return self.docs < self.max_docs and (self.pages == 0 or self.pages + pages <= self.max_pages)
+
+    def _take(self, pages: int):
+        self.docs += 1
+        self.pages += pages
+        self.counters["admitted"] += 1
+        self._publish()
+
+    def _release(self, pages: int):
+        self.docs -= 1
+        self.pages -= pages
+        self._wake()
+
+    def _wake(self):
+        # Strict FIFO - a big document at the head is not overtaken by small ones
+        while self.waiters and self._fits(self.waiters[0][0]):
+            pages, granted = self.waiters.popleft()
+            self._take(pages)
+            granted.set_result(True)
+        self._publish()
+
+    def _reject(self, reason: str, status: int, message: str):
+        self.counters[reason] += 1
+        metrics.inc("rejections_total", reason=reason)
+        raise Rejected(status, message, self.retry_after())
+
+    def _publish(self):
+        metrics.set_gauge("admission_queue_depth", len(self.waiters))
+        metrics.set_gauge("docs_in_flight", self.docs)
+        metrics.set_gauge("pages_in_flight", self.pages)
+
+    def stats(self) -> dict:
+        return {
+            "docs_in_flight": self.docs,
+            "pages_in_flight": self.pages,
+            "max_docs": self.max_docs,
+            "max_pages": self.max_pages,
+            "queued": len(self.waiters),
+            "queue_size": self.queue_size,
+            "retry_after": self.retry_after(),
+            **self.counters,
+        }
+
+
+class AdmissionGate:
+    """ASGI middleware - 429 for POSTs to `paths` while the controller's wait queue
+    is full, answered before the app reads (and spools) the multipart body"""
+
+    def __init__(self, app, controller: AdmissionController, paths=("/process",)):
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths:
+            try:
+                self.controller.check()
+            except Rejected as e:
+                return await e.response()(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+class UploadLimit:
+    """ASGI middleware - 413 once a request body passes `max_bytes`, counted as it
+    streams in, so an oversized upload is never buffered or spooled in full"""
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or self.max_bytes <= 0:
+            return await self.app(scope, receive, send)
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            return await self._too_large()(scope, receive, send)
+        received = 0
+        too_large = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            if too_large:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Past the cap the app sees a client that went away; whatever it
+                    # answers is dropped and the 413 below is sent instead
+                    too_large = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if too_large:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not too_large:
+                raise
+        if too_large and not started:
+            await self._too_large()(scope, receive, send)
+
+    def _message(self) -> str:
+        return f"Upload too large - limit is {round(self.max_bytes / (1024 * 1024), 1):g} MB"
+
+    def _too_large(self) -> JSONResponse:
+        metrics.inc("rejections_total", reason="too_large")
+        return JSONResponse(status_code=413, content={"status": "error", "message": self._message()})
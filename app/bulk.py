@@ -0,0 +1,192 @@
+"""Offline bulk processing: a directory tree of scans -> one JSON line per document.
+
+    python -m app.bulk archive/ --out results.jsonl --template standard
+    python -m app.bulk archive/ --out results.jsonl --template auto --full
+
+Documents go through the same pipeline as /process (text layer, OCR on the
+engine's process pool, NER batches, field extraction) without HTTP. Each
+successful document's content hash is appended to a checkpoint file next to
+the output, so an interrupted run picks up where it stopped. Failed documents
+are written to the output too and are retried on the next run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+SUPPORTED = (".pdf", ".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp")
+
+# Filename words -> template, for --template auto
+TEMPLATE_HINTS = {
+    "aadhaar": "aadhaar", "aadhar": "aadhaar", "pan": "pan", "passport": "passport",
+    "voter": "voter", "epic": "voter", "itr": "income_tax", "income": "income_tax",
+    "licence": "driving_licence", "license": "driving_licence", "dl": "driving_licence",
+}
+
+
+def find_files(root: str) -> list:
+    """Supported files under `root`, sorted so runs and resumes see the same order"""
+    found = []
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED):
+                found.append(os.path.join(directory, name))
+    return found
+
+
+def load_checkpoint(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def read_file(path: str):
+    from app.cache import content_key
+    with open(path, "rb") as f:
+        contents = f.read()
+    return contents, content_key(contents, path)
+
+
+def template_for(path: str, template: str, templates) -> str:
+    if template != "auto":
+        return template
+    words = os.path.splitext(os.path.basename(path))[0].lower().replace("-", "_").split("_")
+    for word in words:
+        if TEMPLATE_HINTS.get(word) in templates:
+            return TEMPLATE_HINTS[word]
+    return "standard"
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Progress:
+    """Running totals, printed as one status line every `interval` seconds"""
+
+    def __init__(self, total: int, interval: float):
+        self.total = total
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.counters = {"done": 0, "failed": 0, "skipped": 0, "pages": 0}
+
+    def add(self, name: str, value: int = 1):
+        self.counters[name] += value
+        if time.perf_counter() - self.last >= self.interval:
+            self.report()
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.start
+        finished = self.counters["done"] + self.counters["failed"]
+        remaining = self.total - finished - self.counters["skipped"]
+        rate = finished / elapsed if elapsed else 0.0
+        return {
+            **self.counters,
+            "total": self.total,
+            "elapsed_s": round(elapsed, 1),
+            "docs_per_s": round(rate, 2),
+            "pages_per_s": round(self.counters["pages"] / elapsed, 2) if elapsed else 0.0,
+            "eta": format_eta(remaining / rate) if rate else None,
+        }
+
+    def report(self):
+        self.last = time.perf_counter()
+        s = self.summary()
+        print(f"⏱️ {s['done'] + s['failed'] + s['skipped']}/{s['total']} "
+              f"({s['skipped']} skipped, {s['failed']} failed) - {s['docs_per_s']} docs/s, "
+              f"{s['pages_per_s']} pages/s, ETA {s['eta'] or '?'}", file=sys.stderr, flush=True)
+
+
+async def run(args) -> dict:
+    from app import main
+
+    files = find_files(args.input)
+    checkpoint = args.checkpoint or args.out + ".done"
+    done = load_checkpoint(checkpoint)
+    progress = Progress(len(files), args.report)
+    seen = set()
+    # Enough documents in flight to keep every worker busy without overflowing the engine queue
+    concurrency = args.concurrency or main.engine_doc_slots()
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    with open(args.out, "a", encoding="utf-8") as out, open(checkpoint, "a", encoding="utf-8") as marks:
+
+        async def process(path):
+            contents, key = await asyncio.to_thread(read_file, path)
+            if key in done or key in seen:  # finished in an earlier run, or a duplicate file
+                progress.add("skipped")
+                return
+            seen.add(key)
+            template = template_for(path, args.template, main.FORM_TEMPLATES)
+            try:
+                result = await main.process_upload(contents, os.path.basename(path), template, args.full)
+            except Exception as e:
+                result = {"status": "error", "message": f"{type(e).__name__}: {e}"}
+            result.pop("session_id", None)
+            record = {"path": os.path.relpath(path, args.input), "hash": key, "template": template, **result}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if result["status"] == "success":
+                # Checkpoint only after the result line is on disk
+                marks.write(key + "\n")
+                marks.flush()
+                progress.counters["pages"] += result.get("page_count", 1)
+                progress.add("done")
+            else:
+                print(f"⚠️ {path}: {result.get('message')}", file=sys.stderr, flush=True)
+                progress.add("failed")
+
+        async def consume():
+            while True:
+                path = await queue.get()
+                try:
+                    if path is None:
+                        return
+                    await process(path)
+                except OSError as e:  # unreadable file
+                    print(f"⚠️ {path}: {e}", file=sys.stderr, flush=True)
+                    progress.add("failed")
+                finally:
+                    queue.task_done()
+
+        consumers = [asyncio.ensure_future(consume()) for _ in range(concurrency)]
+        try:
+            for path in files:
+                await queue.put(path)
+            for _ in consumers:
+                await queue.put(None)
+            await asyncio.gather(*consumers)
+        finally:
+            for task in consumers:
+                task.cancel()
+            main.engine.shutdown()
+    progress.report()
+    return progress.summary()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="directory to scan recursively")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL output, appended to")
+    parser.add_argument("--checkpoint", help="file of finished content hashes (default: <out>.done)")
+    parser.add_argument("--template", default="standard", help="form template, or auto = guess from file name")
+    parser.add_argument("--full", action="store_true", help="read every PDF page (no early exit)")
+    parser.add_argument("--concurrency", type=int, default=0, help="documents in flight (default: fit the engine)")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+    if not os.path.isdir(args.input):
+        parser.error(f"not a directory: {args.input}")
+
+    summary = asyncio.run(run(args))
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cache settings - override with env vars
+CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))                      # in-memory entries
+CACHE_DIR = os.getenv("OCR_CACHE_DIR", "")                                # empty = no disk tier
+CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", str(7 * 24 * 3600)))           # seconds
+CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def content_key(contents: bytes, filename: str) -> str:
+    """Same bytes read the same way -> same key, whatever the upload is called"""
+    kind = "pdf" if filename.lower().endswith(".pdf") else "img"
+    return f"{kind}-{hashlib.sha256(contents).hexdigest()}"
+
+
+class ResultCache:
+    """OCR page results keyed by file hash - in-memory LRU plus optional disk tier"""
+
+    def __init__(self, size: int = CACHE_SIZE, directory: str = CACHE_DIR,
+                 ttl: int = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.size = size
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return self.memory[key]
+        pages = self._disk_get(key)
+        with self.lock:
+            if pages is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._memory_put(key, pages)
+        return pages
+
+    def put(self, key: str, pages: list):
+        with self.lock:
+            self._memory_put(key, pages)
+        self._disk_put(key, pages)
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = sum(self.counters.values())
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "disk": bool(self.directory),
+            }
+
+    def _memory_put(self, key, pages):
+        self.memory[key] = pages
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _disk_get(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.unlink(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key, pages):
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(pages, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then oldest first until under max_bytes"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.ttl:
+                self._unlink(path)
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
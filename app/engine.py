@@ -0,0 +1,77 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.metrics import process_memory, record_stage, run_timed
+
+# Engine settings - override with env vars
+OCR_ENGINE = os.getenv("OCR_ENGINE", "process")          # process | thread
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+OCR_QUEUE_DEPTH = int(os.getenv("OCR_QUEUE_DEPTH", "16"))
+
+
+class EngineBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class Engine:
+    """Runs blocking OCR/extraction jobs on an executor so the event loop stays free"""
+
+    def __init__(self, executor, workers: int, queue_depth: int):
+        self.executor = executor
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.pending = 0
+
+    async def run(self, fn, *args):
+        if self.pending >= self.workers + self.queue_depth:
+            raise EngineBusy(f"OCR queue full ({self.pending} jobs pending)")
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(run_timed, time.time(), fn, *args)
+        self.pending += 1
+        # The slot frees when the executor is done with the job - a caller that stops
+        # waiting (cancelled, early exit) does not stop a job that is already running
+        future.add_done_callback(lambda _: self._release(loop))
+        result, timings = await asyncio.wrap_future(future, loop=loop)
+        for name, seconds in timings:
+            record_stage(name, seconds)
+        return result
+
+    def _release(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._done)
+        except RuntimeError:  # loop already closed at shutdown
+            pass
+
+    def _done(self):
+        self.pending -= 1
+
+    def stats(self) -> dict:
+        stats = {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "pending": self.pending,
+        }
+        processes = getattr(self.executor, "_processes", None) or {}
+        if processes:
+            stats["worker_memory"] = {pid: process_memory(pid) for pid in list(processes)}
+        return stats
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_engine(kind: str = OCR_ENGINE, workers: int = OCR_WORKERS,
+                  queue_depth: int = OCR_QUEUE_DEPTH, start_method: str = None) -> Engine:
+    """`start_method="fork"` lets process workers inherit models preloaded in this process"""
+    workers = max(1, workers)
+    if kind == "thread":
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+    elif kind == "process":
+        context = multiprocessing.get_context(start_method) if start_method else None
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    else:
+        raise ValueError(f"Unknown OCR engine: {kind}")
+    return Engine(executor, workers, max(0, queue_depth))
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import time
+import uuid
+
+# Job settings - override with env vars
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_QUEUE_BYTES = int(os.getenv("JOB_QUEUE_BYTES", str(256 * 1024 * 1024)))   # upload bytes held by unfinished jobs
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))      # seconds a finished job is kept
+JOB_KEEPALIVE = float(os.getenv("JOB_KEEPALIVE", "15"))   # seconds between SSE keepalives while a job is quiet
+
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be queued"""
+
+
+class Job:
+    """One queued document - status, result and a replayable list of progress events"""
+
+    def __init__(self, payload: dict):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.size = sum(len(v) for v in payload.values() if isinstance(v, (bytes, bytearray)))
+        self.status = "queued"
+        self.result = None
+        self.events = []
+        self.created = time.time()
+        self.finished = None
+        self.changed = asyncio.Event()
+        self.emit("queued")
+
+    def emit(self, stage: str, **data):
+        self.events.append({"stage": stage, "time": round(time.time() - self.created, 3), **data})
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def finish(self, status: str, result: dict):
+        self.status = status
+        self.result = result
+        self.finished = time.time()
+        self.payload = None  # drop the upload bytes
+        self.emit(status)
+
+    async def follow(self, idle: float = None):
+        """Yield every event so far, then new ones as they happen, until the job ends.
+        With `idle`, yields None after that many seconds without an event."""
+        sent = 0
+        while True:
+            changed = self.changed
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=idle)
+            except asyncio.TimeoutError:
+                yield None
+
+    def to_dict(self) -> dict:
+        progress = {}
+        for event in self.events:
+            if event["stage"] in ("pages", "page"):
+                progress = {k: event[k] for k in ("pages_done", "pages_total") if k in event}
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": progress,
+            "last_event": self.events[-1],
+            "result": self.result,
+        }
+
+
+class JobManager:
+    """In-process job queue drained by worker tasks; finished jobs expire after `ttl`.
+    Unfinished jobs hold their upload bytes, capped at `max_bytes` in total."""
+
+    def __init__(self, handler, workers: int = JOB_WORKERS, queue_size: int = JOB_QUEUE_SIZE,
+                 ttl: int = JOB_TTL, max_bytes: int = JOB_QUEUE_BYTES):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.jobs = {}
+        self.queue = None
+        self.tasks = []
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def submit(self, **payload) -> Job:
+        self._purge()
+        job = Job(payload)
+        # One job always fits, however big - the upload limit bounds it
+        if self.bytes and self.bytes + job.size > self.max_bytes:
+            raise JobQueueFull(f"Job queue full ({self.bytes // (1024 * 1024)} MB of uploads waiting)")
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue full ({self.queue_size} jobs waiting)")
+        self.bytes += job.size
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str):
+        self._purge()
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict:
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": self.queue.qsize() if self.queue else 0,
+                "bytes_held": self.bytes, "jobs": counts}
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self.jobs.values() if j.finished and j.finished < cutoff]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.emit("running")
+            try:
+                result = await self.handler(job, **job.payload)
+                job.finish("done" if result.get("status") == "success" else "error", result)
+            except Exception as e:
+                job.finish("error", {"status": "error", "message": str(e), "filled_form": {}})
+            finally:
+                self.bytes -= job.size
+                self.queue.task_done()
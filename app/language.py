@@ -0,0 +1,76 @@
+import os
+import numpy as np
+
+# Language settings - override with env vars
+OCR_LANGS = os.getenv("OCR_LANGS", "auto")                  # auto | fixed tesseract packs, e.g. eng+hin
+OCR_DETECT_LANGS = os.getenv("OCR_DETECT_LANGS", "eng+hin")  # packs for the fast detection pass
+LANGDETECT_FALLBACK = os.getenv("LANGDETECT_FALLBACK", "1") == "1"
+
+SCRIPT_MIN_LETTERS = 20     # fewer than this and the histogram says nothing
+SCRIPT_MIN_SHARE = 0.05     # a script with this share of letters gets its pack
+
+# Indic Unicode blocks are 128 code points each, back to back from U+0900:
+# block index -> (script, ISO 639-1, tesseract pack)
+INDIC_BLOCKS = [
+    ("Devanagari", "hi", "hin"),
+    ("Bengali", "bn", "ben"),
+    ("Gurmukhi", "pa", "pan"),
+    ("Gujarati", "gu", "guj"),
+    ("Oriya", "or", "ori"),
+    ("Tamil", "ta", "tam"),
+    ("Telugu", "te", "tel"),
+    ("Kannada", "kn", "kan"),
+    ("Malayalam", "ml", "mal"),
+]
+INDIC_START = 0x0900
+SCRIPT_LANG = {"Latin": ("en", "eng"), **{name: (iso, pack) for name, iso, pack in INDIC_BLOCKS}}
+
+
+def script_histogram(text: str) -> dict:
+    """Letters per script, counted as one vectorized pass over the code points"""
+    points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    latin = np.count_nonzero(((points | 0x20) >= ord("a")) & ((points | 0x20) <= ord("z")))
+    indic = points[(points >= INDIC_START) & (points < INDIC_START + 128 * len(INDIC_BLOCKS))]
+    counts = np.bincount((indic - INDIC_START) >> 7, minlength=len(INDIC_BLOCKS))
+    histogram = {"Latin": int(latin)}
+    histogram.update({INDIC_BLOCKS[i][0]: int(n) for i, n in enumerate(counts) if n})
+    return histogram
+
+
+def dominant_scripts(text: str) -> list:
+    """Scripts holding at least SCRIPT_MIN_SHARE of the letters, most used first"""
+    histogram = script_histogram(text)
+    total = sum(histogram.values())
+    if total < SCRIPT_MIN_LETTERS:
+        return []
+    ranked = sorted(histogram.items(), key=lambda item: -item[1])
+    return [script for script, n in ranked if n / total >= SCRIPT_MIN_SHARE]
+
+
+def tesseract_langs(text: str, available=None) -> str:
+    """Tesseract packs for the scripts in `text` (main script first), limited to
+    the installed packs; None when the text is too short to tell"""
+    scripts = dominant_scripts(text)
+    if not scripts:
+        return None
+    packs = [SCRIPT_LANG[script][1] for script in scripts]
+    if available is not None:
+        packs = [pack for pack in packs if pack in available] or ["eng"]
+    return "+".join(packs)
+
+
+def usable_langs(langs: str, available) -> str:
+    """Drop the packs that are not installed - eng is always kept as a last resort"""
+    packs = [pack for pack in langs.split("+") if pack in available]
+    return "+".join(packs) or "eng"
+
+
+def detect_script_language(text: str, fallback=None) -> str:
+    """ISO code of the main script's language; `fallback(text)` (langdetect)
+    only when there are too few letters to tell"""
+    scripts = dominant_scripts(text)
+    if scripts:
+        return SCRIPT_LANG[scripts[0]][0]
+    if fallback is not None and text.strip():
+        return fallback(text)
+    return "en"
@@ -1,26 +1,75 @@
+import time
+STARTED = time.perf_counter()  # startup clock - before any other import
+
 from fastapi import FastAPI, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 import pytesseract
-from PIL import Image, ImageFilter, ImageEnhance
+from PIL import Image
 import re
-import spacy
 import os
 import io
+import asyncio
+import collections
+import json
 import traceback
-import fitz  # PyMuPDF
-import langdetect
-from langdetect import detect, DetectorFactory
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
 import unicodedata
+import zipfile
+from app.engine import create_engine, EngineBusy
+from app.cache import ResultCache, content_key
+from app.ocr import ocr_pool
+from app.jobs import JobManager, JobQueueFull, JOB_KEEPALIVE
+from app.sessions import SessionStore
+from app.metrics import metrics, process_memory, record_stage, request_timings, stage
+from app.admission import AdmissionController, AdmissionGate, Rejected, UploadLimit, MAX_INFLIGHT_DOCS
+from app.models import registry, PRELOAD_MODELS
+from app.ner import NERBatcher, candidate_lines, ner_batch
+from app.language import (detect_script_language, tesseract_langs, usable_langs,
+                          OCR_LANGS, OCR_DETECT_LANGS, LANGDETECT_FALLBACK)
+from app.preprocess import (decode_image, preprocess, prepare_region, crop_region,
+                            render_dpi, OCR_TARGET_DPI)
+
+# Heavy dependencies (spaCy, PyMuPDF, reportlab, langdetect) load on first use.
+# PRELOAD_MODELS=1 loads them all now instead, so workers forked from this
+# process (gunicorn --preload, the OCR process pool) share their pages.
+if PRELOAD_MODELS:
+    registry.preload()
+
+# 🚀 OCR engine - blocking OCR/extraction runs here, off the event loop
+engine = create_engine(start_method="fork" if PRELOAD_MODELS and os.name == "posix" else None)
+PDF_PAGES_IN_FLIGHT = int(os.getenv("PDF_PAGES_IN_FLIGHT", "4"))   # pages of one PDF on the engine at once
 
-DetectorFactory.seed = 0
+def engine_doc_slots() -> int:
+    """Documents the engine holds at once without a 503. Each keeps up to one
+    page window plus one extraction job queued; one job is left for NER batches."""
+    window = max(1, min(engine.workers, PDF_PAGES_IN_FLIGHT))
+    return max(1, (engine.workers + engine.queue_depth - 1) // (window + 1))
+
+# 🚀 Admission control - caps documents/pages in flight in front of /process
+admission = AdmissionController(max_docs=MAX_INFLIGHT_DOCS or engine_doc_slots())
 
 app = FastAPI(title="AI Form Filling Assistant Pro")
 
+# 🚀 Per-request stage timings -> Server-Timing header
+@app.middleware("http")
+async def server_timing(request, call_next):
+    timings = {}
+    request_timings.set(timings)
+    start = time.perf_counter()
+    response = await call_next(request)
+    timings["total"] = time.perf_counter() - start
+    response.headers["Server-Timing"] = ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+    )
+    return response
+
+# 🚀 Upload byte cap - enforced while the body streams in
+app.add_middleware(UploadLimit)
+
+# 🚀 Queue-full 429 for /process - before FastAPI reads and spools the upload
+app.add_middleware(AdmissionGate, controller=admission, paths=("/process", "/process-batch", "/jobs"))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,19 +80,22 @@ app.add_middleware(
 # Tesseract path - Update if different
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-# spaCy models
-nlp_en = None
-try:
-    nlp_en = spacy.load("en_core_web_sm")
-    print("✅ English spaCy loaded")
-except:
-    print("⚠️ Install: python -m spacy download en_core_web_sm")
+# 🚀 NER micro-batches - concurrent uploads share one nlp.pipe call on the engine
+ner_batcher = NERBatcher(lambda texts: engine.run(ner_batch, texts))
+
+# 🚀 OCR result cache - repeat uploads and template switches skip OCR
+result_cache = ResultCache()
+
+# 🚀 Extraction results by session id - what /download renders
+sessions = SessionStore()
+SESSION_ZIP_MAX = int(os.getenv("SESSION_ZIP_MAX", "100"))   # sessions per /download-zip
 
 # 🚀 EXTENDED FORM TEMPLATES with Govt Form Links + Fill Options
 FORM_TEMPLATES = {
     "standard": {
         "fields": ["full_name", "dob", "address", "aadhaar", "pan", "phone"],
         "title": "Standard Form",
+        "preprocess": "card",
         "gov_links": [
             {"name": "Aadhaar Enrolment", "url": "https://uidai.gov.in/en/my-aadhaar/get-aadhaar.html", "fillable": True},
             {"name": "PAN Application", "url": "https://www.onlineservices.nsdl.com/paam/endUserRegisterContact.html", "fillable": True},
@@ -54,6 +106,7 @@ FORM_TEMPLATES = {
     "aadhaar": {
         "fields": ["full_name", "dob", "address", "aadhaar"],
         "title": "Aadhaar Form",
+        "preprocess": "card",
         "gov_links": [
             {"name": "UIDAI Portal", "url": "https://uidai.gov.in/", "fillable": True},
             {"name": "Aadhaar Update", "url": "https://myaadhaar.uidai.gov.in/", "fillable": True},
@@ -63,6 +116,7 @@ FORM_TEMPLATES = {
     "pan": {
         "fields": ["full_name", "dob", "address", "pan", "phone"],
         "title": "PAN Form",
+        "preprocess": "card",
         "gov_links": [
             {"name": "NSDL PAN", "url": "https://www.tin-nsdl.com/services/pan/panindex.html", "fillable": True},
             {"name": "UTIITSL PAN", "url": "https://www.pan.utiitsl.com/", "fillable": True},
@@ -72,6 +126,7 @@ FORM_TEMPLATES = {
     "passport": {
         "fields": ["full_name", "dob", "address", "phone", "pan"],
         "title": "Passport Form",
+        "preprocess": "document",
         "gov_links": [
             {"name": "Passport Seva", "url": "https://www.passportindia.gov.in/AppOnlineProject/online/formAvailable", "fillable": True},
             {"name": "PSIL Form Download", "url": "https://portal2.passportindia.gov.in/AppOnlineProject/online/formAvailable", "fillable": True},
@@ -81,6 +136,7 @@ FORM_TEMPLATES = {
     "voter": {
         "fields": ["full_name", "dob", "address", "phone"],
         "title": "Voter ID Form",
+        "preprocess": "card",
         "gov_links": [
             {"name": "NVSP Portal", "url": "https://www.nvsp.in/", "fillable": True},
             {"name": "Voters Service", "url": "https://voters.eci.gov.in/", "fillable": True},
@@ -90,6 +146,7 @@ FORM_TEMPLATES = {
     "income_tax": {
         "fields": ["full_name", "dob", "address", "pan", "phone"],
         "title": "Income Tax Form",
+        "preprocess": "document",
         "gov_links": [
             {"name": "ITR-1 (Sahaj)", "url": "https://www.incometax.gov.in/iec/foportal/", "fillable": True},
             {"name": "e-Filing Portal", "url": "https://www.incometax.gov.in/iec/foportal/", "fillable": True},
@@ -99,6 +156,7 @@ FORM_TEMPLATES = {
     "driving_licence": {
         "fields": ["full_name", "dob", "address", "phone"],
         "title": "Driving Licence Form",
+        "preprocess": "card",
         "gov_links": [
             {"name": "Sarathi Parivahan", "url": "https://sarathi.parivahan.gov.in/", "fillable": True},
             {"name": "DL Application", "url": "https://sarathi.parivahan.gov.in/sarathiservice/stateSelection.do", "fillable": True},
@@ -107,134 +165,308 @@ FORM_TEMPLATES = {
     }
 }
 
-def preprocess_image(image: Image.Image) -> Image.Image:
-    """Enhanced preprocessing for better OCR"""
-    image = image.convert('L')
-    image = image.filter(ImageFilter.MedianFilter(size=3))
-    enhancer = ImageEnhance.Contrast(image)
-    image = enhancer.enhance(2.0)
-    enhancer = ImageEnhance.Sharpness(image)
-    return enhancer.enhance(2.0)
+def template_preset(template: str) -> str:
+    """Preprocessing preset for a template - see app/preprocess.py PRESETS"""
+    return FORM_TEMPLATES.get(template, FORM_TEMPLATES["standard"])["preprocess"]
+
+def preprocess_image(image: Image.Image, preset: str = "card", resample: bool = True,
+                     dpi: int = OCR_TARGET_DPI) -> Image.Image:
+    """Normalize to `dpi`, then grayscale/denoise/contrast/binarize as array ops"""
+    with stage("preprocess"):
+        return preprocess(image, preset, resample, dpi)
+
+def langdetect_fallback(text: str) -> str:
+    return registry.get("langdetect")(text[:1000])
 
 def detect_language(text: str) -> str:
+    """Unicode-script histogram; langdetect only when there are too few letters to tell"""
+    with stage("detect_language"):
+        try:
+            return detect_script_language(text, langdetect_fallback if LANGDETECT_FALLBACK else None)
+        except:
+            return "en"
+
+# 🚀 PDF rasterization - straight from upload bytes, one page at a time
+PDF_DPI = OCR_TARGET_DPI
+
+def render_pdf_page(page, dpi: int = PDF_DPI) -> Image.Image:
+    """Build the PIL image from the pixmap samples - no PPM encode/decode.
+    Rendered straight at `dpi` (lower for oversized pages)."""
+    import fitz  # PyMuPDF
+    with stage("rasterize"):
+        dpi = render_dpi(page.rect.width / 72, page.rect.height / 72, dpi)
+        pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72), alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+def render_pdf_region(page, box: tuple, preset: str = "card") -> Image.Image:
+    """Rasterize only a fractional (x0, y0, x1, y1) region of the page, at OCR_ROI_DPI"""
+    import fitz
+    with stage("rasterize"):
+        r = page.rect
+        clip = fitz.Rect(r.x0 + box[0] * r.width, r.y0 + box[1] * r.height,
+                         r.x0 + box[2] * r.width, r.y0 + box[3] * r.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(OCR_ROI_DPI/72, OCR_ROI_DPI/72), clip=clip, alpha=False)
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    return prepare_region(image, preset)
+
+# 🚀 Text-layer fast path - digital PDFs skip rasterization and OCR
+TEXT_LAYER_MIN_CHARS = 30
+
+def text_layer_usable(text: str) -> bool:
+    """Enough readable characters - not empty, not broken-font garbage"""
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < TEXT_LAYER_MIN_CHARS:
+        return False
+    readable = sum(1 for c in chars if unicodedata.category(c)[0] in "LNMP")
+    return readable / len(chars) >= 0.8
+
+def split_pdf(contents: bytes) -> list:
+    """One parse of the upload -> (text, page_pdf) per page: the embedded text when
+    usable, else the page alone as a one-page PDF for its OCR job. Page jobs get
+    only their own page's bytes instead of the whole upload each."""
+    import fitz
+    try:
+        doc = fitz.open(stream=contents, filetype="pdf")
+    except:
+        return []
+    with doc, stage("text_layer"):
+        pages = []
+        for page_num, page in enumerate(doc):
+            try:
+                text = page.get_text()
+            except:
+                text = ""
+            if text_layer_usable(text):
+                pages.append((text, None))
+                continue
+            with fitz.open() as single:
+                single.insert_pdf(doc, from_page=page_num, to_page=page_num)
+                pages.append((None, single.tobytes()))
+        return pages
+
+# 🚀 Per-page OCR jobs - each runs in its own engine worker
+# single:   one full-page pass at OCR_TARGET_DPI
+# two_pass: fast word-box pass at OCR_FAST_DPI, then whitelisted re-reads of
+#           small regions at OCR_ROI_DPI for the template's ID fields the first pass missed
+OCR_MODE = os.getenv("OCR_MODE", "single")
+OCR_FAST_DPI = int(os.getenv("OCR_FAST_DPI", "200"))
+OCR_ROI_DPI = int(os.getenv("OCR_ROI_DPI", "450"))
+OCR_ROI_MAX = int(os.getenv("OCR_ROI_MAX", "6"))           # re-read regions per page
+OCR_DETECT_DPI = int(os.getenv("OCR_DETECT_DPI", "150"))   # script detection pass
+
+def downscale(image: Image.Image, dpi: int, source: int = OCR_TARGET_DPI) -> Image.Image:
+    """A page prepared at `source` DPI, resampled to `dpi`"""
+    scale = min(1.0, dpi / source)
+    if scale == 1.0:
+        return image
+    return image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                        Image.BILINEAR)
+
+def page_langs(image: Image.Image, langs: str = None) -> str:
+    """Tesseract packs for a page - from the caller (e.g. picked from the PDF's text
+    layer), fixed by OCR_LANGS, or from the scripts a fast low-res pass turns up"""
+    if langs:
+        return usable_langs(langs, ocr_pool.languages())
+    if OCR_LANGS != "auto":
+        return OCR_LANGS
+    detect = usable_langs(OCR_DETECT_LANGS, ocr_pool.languages())
+    if "+" not in detect:  # a single pack installed - nothing to choose between
+        return detect
+    with stage("detect_script"):
+        text = ocr_pool.image_to_string(downscale(image, OCR_DETECT_DPI), lang=detect, psm=6)
+    return tesseract_langs(text, ocr_pool.languages()) or detect
+
+def page_dpi() -> int:
+    """Resolution pages are prepared at - two-pass mode reads them at OCR_FAST_DPI first"""
+    return min(OCR_FAST_DPI, OCR_TARGET_DPI) if OCR_MODE == "two_pass" else OCR_TARGET_DPI
+
+def ocr_image(image: Image.Image, hires=None, langs: str = None, fields: list = None,
+              dpi: int = OCR_TARGET_DPI) -> str:
+    """`hires(box)` returns a fractional region of the page at OCR_ROI_DPI and `fields`
+    limits which ID fields may be re-read - two-pass mode only. `image` is at `dpi`."""
     try:
-        return detect(text[:1000]) if text.strip() else "en"
+        if OCR_MODE == "two_pass" and hires is not None:
+            return ocr_two_pass(image, hires, langs, fields, dpi)
+        langs = page_langs(image, langs)
+        with stage("ocr"):
+            return ocr_pool.image_to_string(image, lang=langs, psm=6)
     except:
-        return "en"
+        return "OCR_FAILED"
 
-def pdf_to_images(pdf_path: str) -> list:
+def ocr_pdf_page(page_pdf: bytes, preset: str = "card", langs: str = None, fields: list = None) -> str:
+    """Rasterize and OCR a one-page PDF from split_pdf; failures stay local to the page"""
+    import fitz
     try:
-        doc = fitz.open(pdf_path)
-        images = []
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
-            img_data = pix.tobytes("ppm")
-            img = Image.open(io.BytesIO(img_data))
-            images.append(img)
-        doc.close()
-        return images
+        with fitz.open(stream=page_pdf, filetype="pdf") as doc:
+            page = doc.load_page(0)
+            dpi = page_dpi()
+            img = preprocess_image(render_pdf_page(page, dpi), preset, resample=False, dpi=dpi)
+            return ocr_image(img, lambda box: render_pdf_region(page, box, preset), langs, fields, dpi)
     except:
-        return []
+        return "OCR_FAILED"
+
+def ocr_upload_image(contents: bytes, preset: str = "card", fields: list = None) -> str:
+    dpi = page_dpi()
+    with stage("decode"):
+        image = decode_image(contents, preset, dpi=dpi)
+    full = None
+    
+    def hires(box):
+        # Full-resolution decode only once a region actually needs re-reading
+        nonlocal full
+        if full is None:
+            with stage("decode"):
+                full = decode_image(contents, preset, full=True)
+        with stage("preprocess"):
+            return crop_region(full, box, preset, OCR_ROI_DPI)
+    
+    return ocr_image(preprocess_image(image, preset, dpi=dpi), hires, fields=fields, dpi=dpi)
+
+# 🚀 Precompiled field patterns - each list keeps its original priority order.
+# Every pattern in a group needs its *_GATE to match somewhere, so one cheap
+# gate scan that misses skips the whole group without changing the result.
+AADHAAR_FULL_GATE = re.compile(r'\d{4}[-\s]*\d{4}')
+AADHAAR_FULL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b[2-9]\d{3}\s*\d{4}\s*\d{4}\b',     # 2345 6789 0123
+    r'\b[2-9]\d{3}[-\s]?\d{4}[-\s]?\d{4}\b',
+    r'\b[2-9]\d{11}\b',                    # 234567890123
+    r'\b\d{4}\s+\d{4}\s+\d{4}\b',
+)]
+AADHAAR_MASKED_GATE = re.compile(r'[x*X]{4}', re.IGNORECASE)
+AADHAAR_MASKED_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b[x*X]{4}\s*[x*X]{4}\s*[x*X]{4}\b',      # xxxx xxxx xxxx
+    r'\bXXXX\s+XXXX\s+XXXX\b',
+    r'\b[x*X]{8}\d{4}\b',                       # xxxxxxxx4052
+    r'\b\d{4}[x*X]{8}\b',
+    r'\b\d{4}\s*[x*X]{4}\s*\d{4}\b',
+    r'\b[x*X]{4}\s*\d{4}\s*[x*X]{4}\b',
+    r'\b\d{4}[x*X]{4}\d{4}\b',
+    r'\b[x*X]{4,12}\b',
+    r'\b\d{1,4}[x*X]{4,8}\d{1,4}\b',
+    r'\b[x*X]{4}\.[x*X]{4}\.[x*X]{4}\b',
+)]
+# Full and masked matches only contain these characters and start/end on a
+# digit or mask char, so those patterns run over these spans, not the whole text
+AADHAAR_SPAN = re.compile(r'[\dxX*](?:[\dxX*\s.\-]*[\dxX*])?')
+AADHAAR_CONTEXT_PATTERNS = [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+    r'(?:aadhaar?|aadhar|आधार|uid)\s*[:\-]?\s*([x*X\d\s.-]{8,16})',
+    r'(?:no\.?|number|नं)\s*[:\-]?\s*([x*X\d\s.-]{8,16})',
+)]
+
+PAN_GATE = re.compile(r'[A-Z*]\d{3}|[A-Z]\*{4}', re.IGNORECASE)
+PAN_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b[A-Z]{5}\d{4}[A-Z]\b',
+    r'\b[A-Z]{4}\d{3}[A-Z]{2}\b',
+    r'\b[A-Z*]{5}\d{4}[A-Z*]\b',
+    r'\b[A-Z]{3}\*{2,4}[A-Z]?\d{4}[A-Z]?\b',
+    r'\b[A-Z]{1,4}\*\d{4}[A-Z]\b',
+    r'\b[A-Z]{5}\*{4}[A-Z]?\b',
+    r'(?:pan|pancard)\s*[:\-]?\s*([A-Z*]{3,5}\d{4}[A-Z*]?)',
+    r'(?:p\.?a\.?n\.?|पैन)\s*[:\-]?\s*([A-Z*]{3,5}\d{4}[A-Z]?)',
+)]
+
+PINCODE_GATE = re.compile(r'\d{6}')
+PINCODE_PATTERNS = [re.compile(p) for p in (
+    r'\b\d{6}\b', r'(?:pin|pincode)[:\s]*(\d{6})', r'\d{6}\s*(?:pin|pincode)',
+)]
+
+DOB_GATE = re.compile(r'\d[/\-\.]\d|\d\s*(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', re.IGNORECASE)
+DOB_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{4})\b',
+    r'\b(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2})\b',
+    r'\b(\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2})\b',
+    r'\b(\d{1,2}\s*(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*\d{4})\b',
+)]
+
+PHONE_GATE = re.compile(r'\d{5}\s?\d{5}')
+PHONE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b9\d{9}\b', r'\b\d{10}\b', r'\b\d{5}\s?\d{5}\b', r'\+91\s?\d{10}',
+)]
+
+ADDRESS_KEYWORDS = re.compile("|".join(re.escape(kw) for kw in (
+    "address", "पता", "ward", "street", "गली", "road", "village",
+    "ग्राम", "pin", "dist", "district", "जिला",
+)))
+
+AADHAAR_SCORE_STRIP = re.compile(r'[\s*xX*.]')
+WHITESPACE = re.compile(r'\s')
+NON_DIGITS = re.compile(r'[^\d]')
+TWELVE_DIGITS = re.compile(r'^\d{12}$')
+SPACED_TWELVE_DIGITS = re.compile(r'^\d{4}\s+\d{4}\s+\d{4}$')
+PAN_SHAPE = re.compile(r'[A-Z]{3,5}\d{4}[A-Z*]?')
+
+def first_match(gate, patterns, text: str):
+    """Match of the first pattern (in priority order) found anywhere in text"""
+    if not gate.search(text):
+        return None
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+def score_aadhaar_candidate(candidate: str) -> int:
+    total_len = len(WHITESPACE.sub('', candidate))
+    digit_count = len(NON_DIGITS.sub('', candidate))
+    if not (8 <= total_len <= 16 and digit_count >= 2):
+        return 0
+    cleaned = AADHAAR_SCORE_STRIP.sub('', candidate)
+    x_count = candidate.lower().count('x') + candidate.count('*')
+    
+    if TWELVE_DIGITS.match(cleaned): return 1000
+    elif SPACED_TWELVE_DIGITS.match(candidate): return 900
+    elif x_count >= 4: return 500 + x_count * 10
+    elif total_len >= 12: return 300
+    elif digit_count >= 8: return 200
+    return 0
 
 # 🚀 ULTIMATE Aadhaar Detection - Full + ALL Masked Formats
 def extract_aadhaar(text: str) -> str:
     """🚀 Detects FULL Aadhaar + ALL masked formats with/without field labels"""
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
     candidates = []
+    # endpos one past the span keeps \b seeing the real next character
+    spans = [(m.start(), m.end() + 1) for m in AADHAAR_SPAN.finditer(text) if m.end() - m.start() >= 4]
     
     # 1. FULL Aadhaar Numbers (Highest Priority)
-    full_patterns = [
-        r'\b[2-9]\d{3}\s*\d{4}\s*\d{4}\b',     # 2345 6789 0123
-        r'\b[2-9]\d{3}[-\s]?\d{4}[-\s]?\d{4}\b',
-        r'\b[2-9]\d{11}\b',                    # 234567890123
-        r'\b\d{4}\s+\d{4}\s+\d{4}\b',
-    ]
-    
-    for pattern in full_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        candidates.extend(matches)
+    if AADHAAR_FULL_GATE.search(text):
+        for pattern in AADHAAR_FULL_PATTERNS:
+            for start, end in spans:
+                candidates.extend(pattern.findall(text, start, end))
     
     # 2. MASKED Aadhaar (All formats)
-    masked_patterns = [
-        r'\b[x*X]{4}\s*[x*X]{4}\s*[x*X]{4}\b',      # xxxx xxxx xxxx
-        r'\bXXXX\s+XXXX\s+XXXX\b',
-        r'\b[x*X]{8}\d{4}\b',                       # xxxxxxxx4052
-        r'\b\d{4}[x*X]{8}\b',
-        r'\b\d{4}\s*[x*X]{4}\s*\d{4}\b',
-        r'\b[x*X]{4}\s*\d{4}\s*[x*X]{4}\b',
-        r'\b\d{4}[x*X]{4}\d{4}\b',
-        r'\b[x*X]{4,12}\b',
-        r'\b\d{1,4}[x*X]{4,8}\d{1,4}\b',
-        r'\b[x*X]{4}\.[x*X]{4}\.[x*X]{4}\b',
-    ]
-    
-    for pattern in masked_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        candidates.extend(matches)
+    if AADHAAR_MASKED_GATE.search(text):
+        for pattern in AADHAAR_MASKED_PATTERNS:
+            for start, end in spans:
+                candidates.extend(pattern.findall(text, start, end))
     
     # 3. Context-based
-    context_patterns = [
-        r'(?:aadhaar?|aadhar|आधार|uid)\s*[:\-]?\s*([x*X\d\s.-]{8,16})',
-        r'(?:no\.?|number|नं)\s*[:\-]?\s*([x*X\d\s.-]{8,16})',
-    ]
-    for pattern in context_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
-        candidates.extend(matches)
-    
-    # 4. Score & Filter
-    def score_candidate(candidate):
-        cleaned = re.sub(r'[\s*xX*.]', '', candidate)
-        total_len = len(re.sub(r'\s', '', candidate))
-        digit_count = len(re.sub(r'[^\d]', '', candidate))
-        x_count = candidate.lower().count('x') + candidate.count('*')
-        
-        score = 0
-        if re.match(r'^\d{12}$', cleaned): score += 1000
-        elif re.match(r'^\d{4}\s+\d{4}\s+\d{4}$', candidate): score += 900
-        elif x_count >= 4: score += 500 + x_count * 10
-        elif total_len >= 12: score += 300
-        elif digit_count >= 8: score += 200
-        
-        return score if 8 <= total_len <= 16 and digit_count >= 2 else 0
+    for pattern in AADHAAR_CONTEXT_PATTERNS:
+        candidates.extend(pattern.findall(text))
     
-    scored_candidates = [(score_candidate(c), c) for c in candidates if score_candidate(c) > 0]
-    return max(scored_candidates, key=lambda x: x[0])[1] if scored_candidates else ""
+    # 4. Score each distinct candidate once - first of the best wins
+    best_score, best = 0, ""
+    for candidate in dict.fromkeys(candidates):
+        score = score_aadhaar_candidate(candidate)
+        if score > best_score:
+            best_score, best = score, candidate
+    return best
 
 # 🚀 ULTIMATE PAN Detection
 def extract_pan(text: str) -> str:
-    patterns = [
-        r'\b[A-Z]{5}\d{4}[A-Z]\b',
-        r'\b[A-Z]{4}\d{3}[A-Z]{2}\b',
-        r'\b[A-Z*]{5}\d{4}[A-Z*]\b',
-        r'\b[A-Z]{3}\*{2,4}[A-Z]?\d{4}[A-Z]?\b',
-        r'\b[A-Z]{1,4}\*\d{4}[A-Z]\b',
-        r'\b[A-Z]{5}\*{4}[A-Z]?\b',
-        r'(?:pan|pancard)\s*[:\-]?\s*([A-Z*]{3,5}\d{4}[A-Z*]?)',
-        r'(?:p\.?a\.?n\.?|पैन)\s*[:\-]?\s*([A-Z*]{3,5}\d{4}[A-Z]?)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group().strip()
-    return ""
+    match = first_match(PAN_GATE, PAN_PATTERNS, text)
+    return match.group().strip() if match else ""
 
 def extract_pincode(text: str) -> str:
-    patterns = [r'\b\d{6}\b', r'(?:pin|pincode)[:\s]*(\d{6})', r'\d{6}\s*(?:pin|pincode)']
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            return match.group()
-    return ""
+    match = first_match(PINCODE_GATE, PINCODE_PATTERNS, text)
+    return match.group() if match else ""
 
-def extract_address(text: str, lines: list) -> str:
-    keywords = ["address", "पता", "ward", "street", "गली", "road", "village", 
-                "ग्राम", "pin", "dist", "district", "जिला"]
+def extract_address(text: str, lines: list, pincode: str = None) -> str:
+    if pincode is None:
+        pincode = extract_pincode(text)
     
     for i, line in enumerate(lines):
-        if any(kw in line.lower() for kw in keywords):
+        if ADDRESS_KEYWORDS.search(line.lower()):
             addr_block = " ".join([lines[j].strip() for j in range(i, min(i+4, len(lines)))])
-            pincode = extract_pincode(text)
             if pincode and pincode not in addr_block:
                 addr_block += f", {pincode}"
             return addr_block[:200]
@@ -242,82 +474,199 @@ def extract_address(text: str, lines: list) -> str:
     candidates = [line for line in lines[:20] if 3 <= len(line.split()) <= 12]
     if candidates:
         base_addr = candidates[0]
-        pincode = extract_pincode(text)
         if pincode and pincode not in base_addr:
             base_addr += f", {pincode}"
         return base_addr[:200]
     return ""
 
 def extract_dob(text: str) -> str:
-    patterns = [
-        r'\b(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{4})\b',
-        r'\b(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2})\b',
-        r'\b(\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2})\b',
-        r'\b(\d{1,2}\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*\d{4})\b',
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            return matches[0]
-    return ""
+    match = first_match(DOB_GATE, DOB_PATTERNS, text)
+    return match.group(1) if match else ""
 
 def extract_phone(text: str) -> str:
-    patterns = [r'\b9\d{9}\b', r'\b\d{10}\b', r'\b\d{5}\s?\d{5}\b', r'\+91\s?\d{10}']
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return re.sub(r'\D', '', match.group())
-    return ""
+    match = first_match(PHONE_GATE, PHONE_PATTERNS, text)
+    return NON_DIGITS.sub('', match.group()) if match else ""
 
-def extract_name(text: str, lines: list) -> str:
-    if nlp_en:
+def extract_name(text: str, lines: list, persons: list = None) -> str:
+    """`persons` - PERSON entities already found by the batched NER service;
+    without them NER runs here, over the candidate name lines of every page"""
+    if persons is None:
         try:
-            doc = nlp_en(text[:2000])
-            persons = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
-            if persons:
-                return max(persons, key=len)[:50]
+            persons = ner_batch(["\n".join(candidate_lines(text))])[0]
         except:
-            pass
+            persons = []
+    if persons:
+        return max(persons, key=len)[:50]
     
     for line in lines[:10]:
         if re.match(r"^[A-Z][a-zA-Z\s\-\.]{5,50}$", line) and len(line.split()) >= 2:
             return line.strip()
     return ""
 
-def extract_fields(text: str, detected_lang: str = "en", template: str = "standard"):
-    result = {
-        "full_name": "", "dob": "", "address": "", 
-        "aadhaar": "", "pan": "", "phone": "", "language": detected_lang,
-        "confidence": {}
-    }
+# 🚀 Field extractor registry - each field declares what it depends on, so a
+# template only computes the fields it asks for (and their dependencies)
+FIELD_EXTRACTORS = {
+    "lines": {
+        "extract": lambda ctx: [line.strip() for line in ctx["text"].splitlines() if len(line.strip()) > 2],
+    },
+    "pincode": {
+        "extract": lambda ctx: extract_pincode(ctx["text"]),
+    },
+    "full_name": {
+        "extract": lambda ctx: extract_name(ctx["text"], ctx["lines"], ctx["persons"]),
+        "depends": ["lines"],
+        "confidence": lambda v: 1 if v else 0,
+    },
+    "dob": {
+        "extract": lambda ctx: extract_dob(ctx["text"]),
+        "confidence": lambda v: 1 if v else 0,
+    },
+    "address": {
+        "extract": lambda ctx: extract_address(ctx["text"], ctx["lines"], ctx["pincode"]),
+        "depends": ["lines", "pincode"],
+        "confidence": lambda v: 1 if len(v.split()) > 2 else 0,
+    },
+    "aadhaar": {
+        "extract": lambda ctx: extract_aadhaar(ctx["text"]),
+        "confidence": lambda v: 1 if v and len(v) >= 8 else 0,
+    },
+    "pan": {
+        "extract": lambda ctx: extract_pan(ctx["text"]),
+        "confidence": lambda v: 1 if PAN_SHAPE.search(v) else 0,
+    },
+    "phone": {
+        "extract": lambda ctx: extract_phone(ctx["text"]),
+        "confidence": lambda v: 1 if len(v) == 10 else 0,
+    },
+}
+
+def compute_fields(text: str, fields: list, persons: list = None) -> dict:
+    """Run only the extractors needed for `fields`, each at most once"""
+    ctx = {"text": text, "persons": persons}
     
-    lines = [line.strip() for line in text.splitlines() if len(line.strip()) > 2]
-    
-    result["full_name"] = extract_name(text, lines)
-    result["dob"] = extract_dob(text)
-    result["address"] = extract_address(text, lines)
-    result["aadhaar"] = extract_aadhaar(text)
-    result["pan"] = extract_pan(text)
-    result["phone"] = extract_phone(text)
-    
-    result["confidence"] = {
-        "full_name": 1 if result["full_name"] else 0,
-        "dob": 1 if result["dob"] else 0,
-        "address": 1 if len(result["address"].split()) > 2 else 0,
-        "aadhaar": 1 if result["aadhaar"] and len(result["aadhaar"]) >= 8 else 0,
-        "pan": 1 if re.search(r'[A-Z]{3,5}\d{4}[A-Z*]?', result["pan"]) else 0,
-        "phone": 1 if len(result["phone"]) == 10 else 0
-    }
+    def compute(name):
+        if name not in ctx:
+            spec = FIELD_EXTRACTORS[name]
+            for dep in spec.get("depends", []):
+                compute(dep)
+            with stage("extract_name" if name == "full_name" else "extract_regex"):
+                ctx[name] = spec["extract"](ctx)
+    
+    for name in fields:
+        compute(name)
+    return ctx
+
+# 🚀 Two-pass ROI OCR - where to look again, and what characters can be there.
+# A label word points at its value - the rest of its line when that holds a digit,
+# else the next line ("Permanent Account Number" above the PAN); a candidate word
+# is a partial value worth re-reading.
+ROI_FIELDS = {
+    "aadhaar": {
+        "label": re.compile(r'^(?:aadhaa?r|aadhar|आधार|uid|vid)\W*$', re.IGNORECASE),
+        "candidate": re.compile(r'^(?=.*\d)[\dxX*OoIlSB]{4,12}$'),
+        "whitelist": "0123456789X",
+        "prefix": "Aadhaar:",
+    },
+    "pan": {
+        "label": re.compile(r'^(?:pan|permanent|p\.a\.n\.?|पैन)\W*$', re.IGNORECASE),
+        "candidate": re.compile(r'^(?=.*\d)(?=.*[A-Z])[A-Z0-9*]{8,11}$'),
+        "whitelist": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+        "prefix": "PAN:",
+    },
+    "dob": {
+        "label": re.compile(r'^(?:dob|d\.o\.b\.?|birth|yob|जन्म)\W*$', re.IGNORECASE),
+        "candidate": re.compile(r'^\d{1,4}[/\-.]\S*\d'),
+        "whitelist": "0123456789/-.",
+        "prefix": "DOB:",
+    },
+    "phone": {
+        "label": re.compile(r'^(?:mobile|mob|phone|tel|contact)\W*$', re.IGNORECASE),
+        "candidate": re.compile(r'^\+?\d[\dOoIl]{6,}$'),
+        "whitelist": "0123456789+",
+        "prefix": "Mobile:",
+    },
+}
+
+def group_lines(words: list) -> list:
+    """Words in reading order -> [{"words", "left", "top", "right", "bottom"}, ...]"""
+    lines = {}
+    for word in words:
+        lines.setdefault(word["line"], []).append(word)
+    out = []
+    for line_words in lines.values():
+        out.append({
+            "words": line_words,
+            "left": min(w["left"] for w in line_words),
+            "top": min(w["top"] for w in line_words),
+            "right": max(w["left"] + w["width"] for w in line_words),
+            "bottom": max(w["top"] + w["height"] for w in line_words),
+        })
+    return out
+
+def roi_regions(lines: list, fields: list) -> list:
+    """(field, (left, top, right, bottom)) pixel boxes to re-read - at most one per field and line"""
+    regions = {}
+    for field in fields:
+        spec = ROI_FIELDS[field]
+        for n, line in enumerate(lines):
+            for i, word in enumerate(line["words"]):
+                if spec["label"].match(word["text"]):
+                    rest = line["words"][i + 1:]
+                    if any(c.isdigit() for w in rest for c in w["text"]):
+                        regions.setdefault((field, n), (rest[0]["left"], line["top"], line["right"], line["bottom"]))
+                    elif n + 1 < len(lines):
+                        below = lines[n + 1]
+                        regions.setdefault((field, n + 1), (below["left"], below["top"], below["right"], below["bottom"]))
+                elif spec["candidate"].match(word["text"]):
+                    regions.setdefault((field, n), (line["left"], line["top"], line["right"], line["bottom"]))
+    return [(field, box) for (field, _), box in regions.items()]
+
+def roi_fields(template: str) -> list:
+    """The template's fields that two-pass mode can re-read"""
+    fields = FORM_TEMPLATES.get(template, FORM_TEMPLATES["standard"])["fields"]
+    return [k for k in ROI_FIELDS if k in fields]
+
+def ocr_two_pass(image: Image.Image, hires, langs: str = None, fields: list = None,
+                 dpi: int = OCR_TARGET_DPI) -> str:
+    """Fast low-res pass for words and boxes; re-read only the regions of ID fields it
+    missed - of `fields` when given, else of every field in ROI_FIELDS"""
+    fast = downscale(image, OCR_FAST_DPI, dpi)
+    # Unless told otherwise the fast pass reads every candidate script - its text is the page text
+    if not langs:
+        langs = OCR_DETECT_LANGS if OCR_LANGS == "auto" else OCR_LANGS
+    with stage("ocr"):
+        words = ocr_pool.image_to_data(fast, lang=usable_langs(langs, ocr_pool.languages()), psm=6)
+    lines = group_lines(words)
+    text = "".join(" ".join(w["text"] for w in line["words"]) + "\n" for line in lines)
     
+    wanted = [k for k in ROI_FIELDS if fields is None or k in fields]
+    found = compute_fields(text, wanted)
+    missing = [k for k in wanted if not FIELD_EXTRACTORS[k]["confidence"](found[k])]
+    extra = []
+    for field, (left, top, right, bottom) in roi_regions(lines, missing)[:OCR_ROI_MAX]:
+        pad = (bottom - top) * 0.3
+        box = (max(0.0, (left - pad) / fast.width), max(0.0, (top - pad) / fast.height),
+               min(1.0, (right + pad) / fast.width), min(1.0, (bottom + pad) / fast.height))
+        spec = ROI_FIELDS[field]
+        region = hires(box)
+        with stage("ocr_roi"):
+            value = ocr_pool.image_to_string(region, psm=7, whitelist=spec["whitelist"]).strip()
+        if value:
+            extra.append(f"{spec['prefix']} {value}\n")
+    return text + "".join(extra)
+
+def extract_fields(text: str, detected_lang: str = "en", template: str = "standard", persons: list = None):
     template_config = FORM_TEMPLATES.get(template, FORM_TEMPLATES["standard"])
     template_fields = template_config["fields"]
-    filtered_result = {k: result[k] for k in template_fields}
+    values = compute_fields(text, template_fields, persons)
+    
+    filtered_result = {k: values[k] for k in template_fields}
     filtered_result.update({
         "language": detected_lang,
         "template": template,
         "template_title": template_config["title"],
         "gov_links": template_config["gov_links"],  # 🚀 Fillable govt forms
-        "confidence": result["confidence"]
+        "confidence": {k: FIELD_EXTRACTORS[k]["confidence"](values[k]) for k in template_fields}
     })
     return filtered_result
 
@@ -346,6 +695,9 @@ async def auto_fill_govt_form(template: str = Query("standard"), data: dict = No
     }
 
 def create_filled_form_pdf(data: dict, template_name: str = "standard") -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib import colors
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
@@ -353,7 +705,7 @@ def create_filled_form_pdf(data: dict, template_name: str = "standard") -> bytes
     template_config = FORM_TEMPLATES.get(template_name, FORM_TEMPLATES["standard"])
     c.setFont("Helvetica-Bold", 20)
     c.setFillColor(colors.darkblue)
-    c.drawCentredText(width/2.0, height - 60, f"{template_config['title']} - FILLED")
+    c.drawCentredString(width/2.0, height - 60, f"{template_config['title']} - FILLED")
     
     c.setFillColor(colors.black)
     c.line(50, height - 80, width - 50, height - 80)
@@ -361,13 +713,14 @@ def create_filled_form_pdf(data: dict, template_name: str = "standard") -> bytes
     y_pos = height - 120
     c.setFont("Helvetica-Bold", 12)
     
+    # Extractors return None/"" for fields they did not find
     fields = [
-        ("Full Name", data.get("full_name", "N/A")),
-        ("Date of Birth", data.get("dob", "N/A")),
-        ("Address", data.get("address", "N/A")[:100]),
-        ("Aadhaar", data.get("aadhaar", "N/A")),
-        ("PAN", data.get("pan", "N/A")),
-        ("Phone", data.get("phone", "N/A"))
+        ("Full Name", data.get("full_name") or "N/A"),
+        ("Date of Birth", data.get("dob") or "N/A"),
+        ("Address", (data.get("address") or "N/A")[:100]),
+        ("Aadhaar", data.get("aadhaar") or "N/A"),
+        ("PAN", data.get("pan") or "N/A"),
+        ("Phone", data.get("phone") or "N/A")
     ]
     
     for label, value in fields:
@@ -394,93 +747,448 @@ def create_filled_form_pdf(data: dict, template_name: str = "standard") -> bytes
     c.drawString(70, y_pos, f"{fillable_count} forms ready to fill with your data!")
     
     c.setFont("Helvetica", 10)
-    c.drawCentredText(width/2.0, 50, "Generated by AI Form Filling Assistant Pro")
+    c.drawCentredString(width/2.0, 50, "Generated by AI Form Filling Assistant Pro")
     c.save()
     buffer.seek(0)
     return buffer.getvalue()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "alive"}
+    return {
+        "status": "alive",
+        "engine": engine.stats(),
+        "ocr_backend": ocr_pool.backend,
+        "pid": os.getpid(),
+        "startup_seconds": startup_seconds,
+        "memory": process_memory(),
+        "models": registry.stats(),
+        "ner": ner_batcher.stats(),
+        "admission": admission.stats(),
+        "sessions": sessions.stats(),
+    }
+
+def confident_fields(text: str, fields: list) -> list:
+    """Which of `fields` this text alone fills with full confidence. The name is judged
+    by the line heuristic - spaCy runs once, batched, over the pages finally read."""
+    values = compute_fields(text, fields, persons=[])
+    return [k for k in fields if FIELD_EXTRACTORS[k]["confidence"](values[k])]
+
+def no_progress(stage: str, **data):
+    pass
+
+async def ocr_document(contents: bytes, filename: str, template: str = "standard", full: bool = True,
+                       progress=no_progress, known: list = None) -> list:
+    """Read every page - text layer where usable, OCR otherwise - in page order.
+    Each page is {"text": ..., "source": "text_layer" | "ocr" | "skipped"}.
+    Unless `full`, pages are read in order and reading stops once every template
+    field has been found with confidence; the rest come back as "skipped".
+    `known` is a partial result from the cache - its read pages are reused as they are.
+    `progress(stage, **data)` is called as pages finish."""
+    preset = template_preset(template)
+    fields = roi_fields(template)
+    if not filename.lower().endswith('.pdf'):
+        progress("pages", pages_done=0, pages_total=1, text_layer_pages=0)
+        text = await engine.run(ocr_upload_image, contents, preset, fields)
+        progress("page", page=1, source="ocr", pages_done=1, pages_total=1)
+        return [{"text": text, "source": "ocr"}]
+    
+    split = await engine.run(split_pdf, contents)
+    text_layer = [text for text, _ in split]
+    if known is not None and len(known) != len(split):
+        known = None
+    # Scanned pages of a partly digital PDF take their OCR languages from the text layer
+    digital = "".join(text for text in text_layer if text is not None)
+    langs = tesseract_langs(digital) if OCR_LANGS == "auto" else None
+    pages_total = len(text_layer)
+    pages_done = 0
+    progress("pages", pages_done=0, pages_total=pages_total,
+             text_layer_pages=sum(1 for text in text_layer if text is not None))
+    # Cap rendered pages alive at once - peak memory stays flat as page count grows
+    window = max(1, min(engine.workers, PDF_PAGES_IN_FLIGHT))
+    slots = asyncio.Semaphore(window)
+    
+    async def read_page(page_num):
+        nonlocal pages_done
+        if known is not None and known[page_num]["source"] != "skipped":
+            page = known[page_num]
+        elif text_layer[page_num] is not None:
+            page = {"text": text_layer[page_num], "source": "text_layer"}
+        else:
+            async with slots:
+                text = await engine.run(ocr_pdf_page, split[page_num][1], preset, langs, fields)
+            page = {"text": text, "source": "ocr"}
+        pages_done += 1
+        progress("page", page=page_num + 1, source=page["source"], pages_done=pages_done, pages_total=pages_total)
+        return page
+    
+    if full:
+        return await asyncio.gather(*(read_page(n) for n in range(len(text_layer))))
+    
+    # 🚀 Incremental mode - extract after each page, stop once the template is filled
+    missing = list(FORM_TEMPLATES.get(template, FORM_TEMPLATES["standard"])["fields"])
+    pages = []
+    in_flight = collections.deque()
+    next_page = 0
+    try:
+        while missing and len(pages) < len(text_layer):
+            while next_page < len(text_layer) and len(in_flight) < window:
+                in_flight.append(asyncio.ensure_future(read_page(next_page)))
+                next_page += 1
+            page = await in_flight.popleft()
+            pages.append(page)
+            found = await engine.run(confident_fields, page["text"], missing)
+            missing = [k for k in missing if k not in found]
+        # Read-ahead pages are already running on the engine - let them finish and keep their text
+        while in_flight:
+            pages.append(await in_flight.popleft())
+    finally:
+        for task in in_flight:
+            task.cancel()
+    
+    skipped = [{"text": "", "source": "skipped"}] * (len(text_layer) - len(pages))
+    if skipped:
+        progress("skipped", pages_skipped=len(skipped))
+    return pages + skipped
+
+def page_text(pages: list) -> str:
+    return "".join(page["text"] + "\n" for page in pages if page["source"] != "skipped")
+
+def build_result(pages: list, filename: str, template: str = "standard", persons: list = None) -> dict:
+    """Language detection + field extraction over the read pages"""
+    full_text = page_text(pages)
+    pages_skipped = sum(1 for page in pages if page["source"] == "skipped")
+    
+    if not full_text.strip():
+        return {
+            "status": "error", 
+            "message": "No text detected. Check Tesseract installation.",
+            "filled_form": {}
+        }
+    
+    lang = detect_language(full_text)
+    extracted = extract_fields(full_text, lang, template, persons)
+    extracted["filename"] = filename
+    extracted["page_count"] = len(pages)
+    extracted["pages_skipped"] = pages_skipped
+    extracted["raw_text_preview"] = full_text[:500]
+    
+    return {
+        "status": "success",
+        "filename": filename,
+        "language": lang,
+        "page_count": len(pages),
+        "pages_skipped": pages_skipped,
+        "pages": [{"page": n + 1, "source": page["source"]} for n, page in enumerate(pages)],
+        "template": template,
+        "filled_form": extracted
+    }
+
+@app.on_event("shutdown")
+async def shutdown_engine():
+    engine.shutdown()
+
+async def process_upload(contents: bytes, filename: str, template: str = "standard", full: bool = False,
+                         progress=no_progress) -> dict:
+    """Cache lookup -> OCR -> extraction for one upload; shared by /process, /process-batch and /jobs"""
+    metrics.inc("bytes_processed_total", len(contents))
+    # OCR text depends on the preprocessing preset and OCR mode, not on the template itself -
+    # except for the fields two-pass mode re-reads
+    key = f"{content_key(contents, filename)}-{template_preset(template)}"
+    if OCR_MODE != "single":
+        key += f"-{OCR_MODE}-{'+'.join(roi_fields(template))}"
+    known = await asyncio.to_thread(result_cache.get, key)
+    if known is not None and all(page["source"] != "skipped" for page in known):
+        pages, cached = known, True
+        progress("cache_hit", pages_done=len(pages), pages_total=len(pages))
+    else:
+        # A partial entry (early exit left pages "skipped") is completed, not redone:
+        # read pages come from the cache, only the pages still needed are read
+        pages = await ocr_document(contents, filename, template, full, progress, known)
+        fresh = [page for n, page in enumerate(pages) if page["source"] != "skipped"
+                 and (known is None or page is not known[n])]
+        cached = known is not None and not fresh
+        for page in fresh:
+            metrics.inc("pages_total", source=page["source"])
+        ocr_failures = sum(1 for page in fresh if page["text"] == "OCR_FAILED")
+        if ocr_failures:
+            metrics.inc("errors_total", ocr_failures, stage="ocr")
+        elif fresh:
+            await asyncio.to_thread(result_cache.put, key, pages)
+    
+    progress("extracting")
+    # Names go through the batched NER service - one nlp.pipe call serves many uploads
+    persons = None
+    if "full_name" in FORM_TEMPLATES.get(template, FORM_TEMPLATES["standard"])["fields"]:
+        try:
+            with stage("ner_wait"):
+                persons = await ner_batcher.submit("\n".join(candidate_lines(page_text(pages))))
+        except EngineBusy:
+            raise
+        except Exception as e:
+            # NER is best effort - extract_name falls back to its line heuristics
+            metrics.inc("errors_total", stage="ner")
+            print(f"⚠️ NER failed: {e}")
+            persons = []
+    result = await engine.run(build_result, pages, filename, template, persons)
+    metrics.inc("documents_total", status=result["status"])
+    if result["status"] == "success":
+        result["cached"] = cached
+        result["session_id"] = sessions.put({k: result[k] for k in ("filename", "template", "filled_form")})
+    return result
+
+def count_pages(contents: bytes, filename: str) -> int:
+    """Pages an upload will occupy - read from the PDF trailer, no rendering"""
+    if not filename.lower().endswith('.pdf'):
+        return 1
+    import fitz
+    try:
+        with fitz.open(stream=contents, filetype="pdf") as doc:
+            return len(doc)
+    except:
+        return 1
 
 @app.post("/process")
-async def process_document(file: UploadFile = File(...), template: str = Query("standard")):
+async def process_document(file: UploadFile = File(...), template: str = Query("standard"),
+                           full: bool = Query(False), debug: bool = Query(False)):
     try:
         if not file.filename:
             return JSONResponse(status_code=400, content={"status": "error", "message": "No file"})
         
-        contents = await file.read()
-        filename = file.filename.lower()
-        is_pdf = filename.endswith('.pdf')
-        
-        images = []
-        temp_file = None
-        try:
-            if is_pdf:
-                temp_file = f"temp_{os.urandom(8).hex()}.pdf"
-                with open(temp_file, "wb") as f:
-                    f.write(contents)
-                images = pdf_to_images(temp_file)
-            else:
-                image = Image.open(io.BytesIO(contents))
-                images = [preprocess_image(image)]
-        finally:
-            if temp_file and os.path.exists(temp_file):
-                os.unlink(temp_file)
-        
-        full_text = ""
-        for img in images:
-            try:
-                text = pytesseract.image_to_string(img, config='--psm 6')
-                full_text += text + "\n"
-            except:
-                full_text += "OCR_FAILED\n"
-        
-        if not full_text.strip():
-            return JSONResponse(status_code=400, content={
-                "status": "error", 
-                "message": "No text detected. Check Tesseract installation.",
-                "filled_form": {}
-            })
-        
-        lang = detect_language(full_text)
-        extracted = extract_fields(full_text, lang, template)
-        extracted["filename"] = file.filename
-        extracted["page_count"] = len(images)
-        extracted["raw_text_preview"] = full_text[:500]
-        
-        return {
-            "status": "success",
-            "filename": file.filename,
-            "language": lang,
-            "page_count": len(images),
-            "template": template,
-            "filled_form": extracted
-        }
+        with stage("upload_read"):
+            contents = await file.read()
+        pages = await asyncio.to_thread(count_pages, contents, file.filename)
+        wait_start = time.perf_counter()
+        async with admission.admit(pages):
+            record_stage("admission_wait", time.perf_counter() - wait_start)
+            result = await process_upload(contents, file.filename, template, full)
+        if debug:
+            result["timings_ms"] = {k: round(v * 1000, 2) for k, v in (request_timings.get() or {}).items()}
+        if result["status"] != "success":
+            return JSONResponse(status_code=400, content=result)
+        return result
+    except Rejected as e:
+        return e.response()
+    except EngineBusy as e:
+        metrics.inc("errors_total", stage="engine_busy")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "message": str(e), "filled_form": {}},
+            headers={"Retry-After": str(admission.retry_after())}
+        )
     except Exception as e:
+        metrics.inc("errors_total", stage="process")
         return JSONResponse(
             status_code=500,
             content={"status": "error", "message": str(e), "filled_form": {}}
         )
 
-@app.get("/download/{session_id}")
-async def download_form(session_id: str, template: str = Query("standard")):
-    demo_data = {
-        "full_name": "Rahul Sharma", 
-        "dob": "15/08/1990", 
-        "address": "House 123, MG Road, Dispur, Assam - 781006",
-        "aadhaar": "xxxx xxxx 4052",
-        "pan": "ABCDE1234F",
-        "phone": "9876543210",
-        "gov_links": FORM_TEMPLATES[template]["gov_links"]
+# 🚀 Batch upload - one NDJSON line per document, streamed as each finishes
+@app.post("/process-batch")
+async def process_batch(files: list[UploadFile] = File(...), template: str = Query("standard"),
+                        full: bool = Query(False)):
+    uploads = [(file.filename or "", await file.read()) for file in files]
+    # Enough documents in flight to keep every worker busy without overflowing the engine queue
+    slots = asyncio.Semaphore(engine_doc_slots())
+    
+    async def run_one(index, filename, contents):
+        async with slots:
+            try:
+                if not filename:
+                    result = {"status": "error", "message": "No file"}
+                else:
+                    # Batch documents share the server-wide document/page budget with /process
+                    pages = await asyncio.to_thread(count_pages, contents, filename)
+                    async with admission.admit(pages, deadline=False):
+                        result = await process_upload(contents, filename, template, full)
+            except Exception as e:
+                result = {"status": "error", "message": str(e), "filled_form": {}}
+        return {"index": index, "filename": filename, **result}
+    
+    async def stream():
+        tasks = [asyncio.ensure_future(run_one(i, name, data)) for i, (name, data) in enumerate(uploads)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield json.dumps(await done, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# 🚀 Async jobs - POST returns at once, progress streams over Server-Sent Events
+async def run_job(job, contents: bytes, filename: str, template: str, full: bool) -> dict:
+    pages = await asyncio.to_thread(count_pages, contents, filename)
+    async with admission.admit(pages, deadline=False):
+        job.emit("admitted")
+        return await process_upload(contents, filename, template, full, progress=job.emit)
+
+jobs = JobManager(run_job)
+
+@app.on_event("startup")
+async def start_jobs():
+    jobs.start()
+
+startup_seconds = None
+
+@app.on_event("startup")
+async def report_startup():
+    global startup_seconds
+    startup_seconds = round(time.perf_counter() - STARTED, 3)
+    metrics.set_gauge("startup_seconds", startup_seconds)
+    memory = process_memory()
+    print(f"✅ Worker {os.getpid()} ready in {startup_seconds}s - memory {memory}")
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    await jobs.stop()
+
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...), template: str = Query("standard"),
+                     full: bool = Query(False)):
+    if not file.filename:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "No file"})
+    contents = await file.read()
+    try:
+        job = jobs.submit(contents=contents, filename=file.filename, template=template, full=full)
+    except JobQueueFull as e:
+        return JSONResponse(status_code=503, content={"status": "error", "message": str(e)})
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
     }
-    pdf_bytes = create_filled_form_pdf(demo_data, template)
-    return StreamingResponse(
-        io.BytesIO(pdf_bytes),
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown or expired job"})
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown or expired job"})
+    
+    async def stream():
+        async for event in job.follow(idle=JOB_KEEPALIVE):
+            if event is None:
+                # Comment line - keeps proxies from closing a stream that is quiet for a long page
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    metrics.set_gauge("engine_pending", engine.pending)
+    metrics.set_gauge("engine_workers", engine.workers)
+    metrics.set_gauge("jobs_queued", jobs.queue.qsize() if jobs.queue else 0)
+    cache = result_cache.stats()
+    for name in ("memory_hits", "disk_hits", "misses"):
+        metrics.set_gauge(f"cache_{name}", cache[name])
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return result_cache.stats()
+
+async def session_pdf(session_id: str, template: str):
+    """Filled PDF for a stored result - rendered once per (session, template), then served from memory"""
+    pdf = sessions.get_pdf(session_id, template)
+    if pdf is not None:
+        return pdf
+    result = sessions.get(session_id)
+    if result is None:
+        return None
+    data = {**result["filled_form"], "gov_links": FORM_TEMPLATES[template]["gov_links"]}
+    with stage("render_pdf"):
+        pdf = await engine.run(create_filled_form_pdf, data, template)
+    sessions.put_pdf(session_id, template, pdf)
+    return pdf
+
+def unknown_template(template: str) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"status": "error", "message": f"Unknown template: {template}"})
+
+@app.get("/download/{session_id}")
+async def download_form(session_id: str, template: str = Query(None)):
+    result = sessions.get(session_id)
+    if result is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown or expired session"})
+    template = template or result["template"]
+    if template not in FORM_TEMPLATES:
+        return unknown_template(template)
+    try:
+        pdf_bytes = await session_pdf(session_id, template)
+    except EngineBusy as e:
+        return JSONResponse(status_code=503, content={"status": "error", "message": str(e)},
+                            headers={"Retry-After": str(admission.retry_after())})
+    if pdf_bytes is None:  # expired between the two lookups
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown or expired session"})
+    return Response(
+        pdf_bytes,
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={template}_form.pdf"}
     )
 
+class ZipSink(io.RawIOBase):
+    """Write-only target for zipfile - the archive is handed out chunk by chunk, never held whole"""
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+# 🚀 Bulk download - one ZIP of filled PDFs, streamed as each PDF is rendered
+@app.get("/download-zip")
+async def download_zip(session_ids: list[str] = Query(...), template: str = Query(None)):
+    if len(session_ids) > SESSION_ZIP_MAX:
+        return JSONResponse(status_code=400, content={"status": "error",
+                            "message": f"At most {SESSION_ZIP_MAX} sessions per archive"})
+    if template and template not in FORM_TEMPLATES:
+        return unknown_template(template)
+    found = [(session_id, sessions.get(session_id)) for session_id in dict.fromkeys(session_ids)]
+    missing = [session_id for session_id, result in found if result is None]
+    found = [(session_id, result) for session_id, result in found if result is not None]
+    if not found:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown or expired sessions"})
+    
+    async def stream():
+        sink = ZipSink()
+        # PDFs are already compressed - store them as they are
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+            for n, (session_id, result) in enumerate(found, 1):
+                name = template or result["template"]
+                try:
+                    pdf = await session_pdf(session_id, name)
+                except Exception:
+                    pdf = None
+                if pdf is None:
+                    missing.append(session_id)
+                    continue
+                stem = os.path.splitext(os.path.basename(result["filename"]))[0] or session_id
+                archive.writestr(f"{n:03d}_{stem}_{name}.pdf", pdf)
+                yield sink.drain()
+            if missing:
+                archive.writestr("missing.txt", "\n".join(missing) + "\n")
+        yield sink.drain()
+    
+    return StreamingResponse(stream(), media_type="application/zip",
+                             headers={"Content-Disposition": "attachment; filename=filled_forms.zip"})
+
 @app.get("/templates")
 async def get_templates():
     templates_list = []
@@ -0,0 +1,134 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+PREFIX = "formfill"
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """Process-wide stage histograms, counters and gauges in Prometheus text format"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self.lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self.lock:
+            self.gauges[name] = value
+
+    def render(self) -> str:
+        out = []
+        with self.lock:
+            out.append(f"# HELP {PREFIX}_stage_seconds Time spent in each pipeline stage")
+            out.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+            for stage, hist in sorted(self.stages.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    out.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                out.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                out.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {hist.total:.6f}')
+                out.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {hist.count}')
+            for name in sorted({name for name, _ in self.counters}):
+                out.append(f"# TYPE {PREFIX}_{name} counter")
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        out.append(f"{PREFIX}_{name}{_labels(dict(labels))} {value}")
+            for name, value in sorted(self.gauges.items()):
+                out.append(f"# TYPE {PREFIX}_{name} gauge")
+                out.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(out) + "\n"
+
+
+metrics = Metrics()
+
+# Per-request stage totals (seconds), read back for Server-Timing and ?debug=true
+request_timings = ContextVar("request_timings", default=None)
+
+# Set while a function runs inside an engine worker - stages are collected
+# there and shipped back with the result instead of recorded in that process
+_worker = threading.local()
+
+
+def record_stage(stage: str, seconds: float):
+    collected = getattr(_worker, "timings", None)
+    if collected is not None:
+        collected.append((stage, seconds))
+        return
+    metrics.observe_stage(stage, seconds)
+    timings = request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def run_timed(submitted: float, fn, *args):
+    """Executor entry point - returns (result, [(stage, seconds), ...])"""
+    _worker.timings = [("queue_wait", max(0.0, time.time() - submitted))]
+    try:
+        return fn(*args), _worker.timings
+    finally:
+        _worker.timings = None
+
+
+def process_memory(pid="self") -> dict:
+    """Resident and proportional set size in MB. PSS splits pages shared with
+    forked siblings between them; it is only available on Linux."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {"rss_mb": round(int(fields["Rss"].split()[0]) / 1024, 1),
+                "pss_mb": round(int(fields["Pss"].split()[0]) / 1024, 1)}
+    except (OSError, KeyError, ValueError):
+        pass
+    if pid != "self":
+        return {}
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {}
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"peak_rss_mb": round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)}
@@ -0,0 +1,83 @@
+import gc
+import importlib
+import os
+import threading
+import time
+
+# Model settings - override with env vars
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"    # load everything at import, before fork
+
+# Only the NER component runs - these are never loaded
+NON_NER_PIPES = ["tok2vec", "tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+# Imported on first use; preload() pulls them in ahead of a fork
+HEAVY_MODULES = ["fitz", "reportlab.pdfgen.canvas", "pdfplumber", "langdetect"]
+
+
+def load_spacy_ner():
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL, exclude=NON_NER_PIPES)
+    except OSError:
+        print(f"⚠️ Install: python -m spacy download {SPACY_MODEL}")
+        return None
+
+
+def load_langdetect():
+    from langdetect import detect, DetectorFactory
+    DetectorFactory.seed = 0
+    detect("warm up")  # language profiles load on the first call
+    return detect
+
+
+class ModelRegistry:
+    """Heavy models loaded once per process on first use, shared by every caller.
+    A loader that fails or returns None is not retried."""
+
+    def __init__(self):
+        self.loaders = {}
+        self.models = {}
+        self.load_seconds = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: str, loader):
+        self.loaders[name] = loader
+
+    def get(self, name: str):
+        with self.lock:
+            if name not in self.models:
+                start = time.perf_counter()
+                try:
+                    self.models[name] = self.loaders[name]()
+                except Exception as e:
+                    print(f"⚠️ {name} unavailable: {e}")
+                    self.models[name] = None
+                self.load_seconds[name] = round(time.perf_counter() - start, 3)
+                if self.models[name] is not None:
+                    print(f"✅ {name} loaded in {self.load_seconds[name]}s")
+            return self.models[name]
+
+    def preload(self):
+        """Import heavy modules and load every model now - call before forking workers"""
+        for module in HEAVY_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+        for name in self.loaders:
+            self.get(name)
+        # Preloaded objects never move again - keep GC passes from touching
+        # (and so copying) their pages in forked workers
+        gc.freeze()
+
+    def stats(self) -> dict:
+        return {
+            name: {"loaded": self.models.get(name) is not None, "load_seconds": self.load_seconds.get(name)}
+            for name in self.loaders
+        }
+
+
+registry = ModelRegistry()
+registry.register("ner_en", load_spacy_ner)
+registry.register("langdetect", load_langdetect)
@@ -1,14 +1,142 @@
-import spacy
+import asyncio
+import os
 import re
+import time
+from app.metrics import metrics, stage
+from app.models import registry
+
+# NER settings - override with env vars
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "32"))        # texts per nlp.pipe call
+NER_BATCH_WAIT_MS = int(os.getenv("NER_BATCH_WAIT_MS", "10"))  # latency budget to fill a batch
+NER_MAX_LINES = int(os.getenv("NER_MAX_LINES", "40"))          # candidate name lines per document
+NER_CHUNK_CHARS = 1000
+NER_MAX_CHUNKS = 50
+
+# Lines that can hold a person's name: letters only, a few words - or a "Name" label
+NAME_LINE = re.compile(r"^[^\W\d_][^\d_:/@]{2,60}$")
+NAME_LABEL = re.compile(r"\bname\b|नाम", re.IGNORECASE)
+NOT_NAME = re.compile(r"\b(?:government|india|income|tax|department|election|commission|"
+                      r"address|permanent|account|number|date|birth|dob|male|female|signature|"
+                      r"card|republic|authority|unique|identification|mobile|phone|road|street|"
+                      r"district|dist|pin|application|declaration|form)\b", re.IGNORECASE)
+
+
+def candidate_lines(text: str, limit: int = NER_MAX_LINES) -> list:
+    """Name-like lines from every page - the model sees these, not the whole document"""
+    out = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line in out:
+            continue
+        if NAME_LABEL.search(line) or (NAME_LINE.match(line) and 2 <= len(line.split()) <= 5
+                                       and not NOT_NAME.search(line)):
+            out.append(line)
+            if len(out) >= limit:
+                break
+    return out
+
+
+def ner_batch(texts: list) -> list:
+    """PERSON entities for each text - one nlp.pipe call for the whole batch.
+    Runs as an engine job, so the model lives in the OCR workers."""
+    nlp = registry.get("ner_en")
+    results = [[] for _ in texts]
+    todo = [i for i, text in enumerate(texts) if text.strip()]
+    if nlp is None or not todo:
+        return results
+    with stage("ner"):
+        docs = nlp.pipe((texts[i] for i in todo), batch_size=NER_BATCH_SIZE)
+        for i, doc in zip(todo, docs):
+            results[i] = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
+    return results
+
+
+class NERBatcher:
+    """Collects texts from concurrent requests and sends them to `runner` (async,
+    texts -> results) in micro-batches: a batch goes when it is full or when its
+    first text has waited `wait_ms`, so no caller waits much past the budget."""
+
+    def __init__(self, runner, batch_size: int = NER_BATCH_SIZE, wait_ms: int = NER_BATCH_WAIT_MS):
+        self.runner = runner
+        self.batch_size = max(1, batch_size)
+        self.wait = wait_ms / 1000
+        self.pending = []
+        self.timer = None
+        self.counters = {"batches": 0, "texts": 0, "in_flight": 0}
+
+    async def submit(self, text: str) -> list:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((text, future))
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: list):
+        self.counters["batches"] += 1
+        self.counters["texts"] += len(batch)
+        self.counters["in_flight"] += 1
+        metrics.inc("ner_batches_total")
+        metrics.inc("ner_texts_total", len(batch))
+        start = time.perf_counter()
+        try:
+            results = await self.runner([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.counters["in_flight"] -= 1
+            metrics.observe_stage("ner_batch", time.perf_counter() - start)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        batches = self.counters["batches"]
+        return {
+            **self.counters,
+            "queued": len(self.pending),
+            "avg_batch": round(self.counters["texts"] / batches, 2) if batches else 0.0,
+            "batch_size": self.batch_size,
+            "wait_ms": self.wait * 1000,
+        }
+
+
+def text_chunks(text: str, size: int = NER_CHUNK_CHARS, limit: int = NER_MAX_CHUNKS):
+    """Whole lines packed into chunks of about `size` characters, at most `limit` of them"""
+    chunk, length, count = [], 0, 0
+    for line in text.splitlines():
+        chunk.append(line)
+        length += len(line) + 1
+        if length >= size:
+            yield "\n".join(chunk)
+            chunk, length, count = [], 0, count + 1
+            if count >= limit:
+                return
+    if chunk:
+        yield "\n".join(chunk)
 
-nlp = spacy.load("en_core_web_sm")
 
 def extract_entities(text):
-    doc = nlp(text)
+    nlp = registry.get("ner_en")
     entities = {}
 
-    for ent in doc.ents:
-        entities[ent.label_] = ent.text
+    if nlp:
+        # Bounded chunks through nlp.pipe instead of one pass over unbounded text
+        for doc in nlp.pipe(text_chunks(text), batch_size=NER_BATCH_SIZE):
+            for ent in doc.ents:
+                entities[ent.label_] = ent.text
 
     # Extract Aadhaar number if present
     aadhaar = re.search(r"\b\d{4}\s\d{4}\s\d{4}\b", text)
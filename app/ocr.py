@@ -1,9 +1,162 @@
+import os
+import queue
+import threading
 import pytesseract
-import pdfplumber
 from PIL import Image
 
+# Optional: tesserocr talks to libtesseract directly, so an engine keeps its
+# language data loaded between pages and reads PIL images from memory
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto")      # auto | tesserocr | pytesseract
+OCR_POOL_SIZE = int(os.getenv("OCR_POOL_SIZE", "4"))
+
+
+class PytesseractEngine:
+    """Fallback - forks a tesseract process per call"""
+    name = "pytesseract"
+
+    def __init__(self, lang: str = "eng", psm: int = 3, whitelist: str = ""):
+        self.lang = lang
+        self.config = f"--psm {psm}"
+        if whitelist:
+            self.config += f" -c tessedit_char_whitelist={whitelist}"
+
+    def image_to_string(self, image: Image.Image) -> str:
+        return pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+    def image_to_data(self, image: Image.Image) -> list:
+        data = pytesseract.image_to_data(image, lang=self.lang, config=self.config,
+                                         output_type=pytesseract.Output.DICT)
+        return [
+            {"text": text, "conf": float(data["conf"][i]),
+             "left": data["left"][i], "top": data["top"][i],
+             "width": data["width"][i], "height": data["height"][i],
+             "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i])}
+            for i, text in enumerate(data["text"]) if text.strip()
+        ]
+
+
+class TesserocrEngine:
+    """Long-lived libtesseract instance - language data stays loaded"""
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng", psm: int = 3, whitelist: str = ""):
+        self.api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+        if whitelist:
+            self.api.SetVariable("tessedit_char_whitelist", whitelist)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        self.api.SetImage(image)
+        try:
+            return self.api.GetUTF8Text()
+        finally:
+            self.api.Clear()
+
+    def image_to_data(self, image: Image.Image) -> list:
+        self.api.SetImage(image)
+        try:
+            self.api.Recognize()
+            iterator = self.api.GetIterator()
+            if iterator is None:
+                return []
+            words, line = [], 0
+            level = tesserocr.RIL.WORD
+            for word in tesserocr.iterate_level(iterator, level):
+                if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line += 1
+                text = word.GetUTF8Text(level)
+                if not text or not text.strip():
+                    continue
+                x0, y0, x1, y1 = word.BoundingBox(level)
+                words.append({"text": text, "conf": word.Confidence(level),
+                              "left": x0, "top": y0, "width": x1 - x0, "height": y1 - y0,
+                              "line": line})
+            return words
+        finally:
+            self.api.Clear()
+
+
+class OCREnginePool:
+    """Warm engines per (lang, psm, whitelist), checked out by one thread at a time"""
+
+    def __init__(self, backend: str = OCR_BACKEND, size: int = OCR_POOL_SIZE):
+        if backend == "auto":
+            backend = "tesserocr" if tesserocr else "pytesseract"
+        if backend == "tesserocr" and tesserocr is None:
+            raise RuntimeError("OCR_BACKEND=tesserocr but tesserocr is not installed")
+        self.engine_cls = TesserocrEngine if backend == "tesserocr" else PytesseractEngine
+        self.backend = backend
+        self.size = max(1, size)
+        self.lock = threading.Lock()
+        self.installed = None
+        self._reset()
+
+    def _reset(self):
+        # Engines are never shared across a fork - each worker process warms its own
+        self.pid = os.getpid()
+        self.idle = {}
+        self.slots = {}
+
+    def languages(self) -> set:
+        """Installed tesseract language packs - asked once, assumed eng-only on failure"""
+        if self.installed is None:
+            try:
+                if self.backend == "tesserocr":
+                    self.installed = set(tesserocr.get_languages()[1])
+                else:
+                    self.installed = set(pytesseract.get_languages(config=""))
+            except Exception:
+                self.installed = {"eng"}
+        return self.installed
+
+    def image_to_string(self, image: Image.Image, lang: str = "eng", psm: int = 3, whitelist: str = "") -> str:
+        engine, idle = self._acquire(lang, psm, whitelist)
+        try:
+            return engine.image_to_string(image)
+        finally:
+            idle.put(engine)
+
+    def image_to_data(self, image: Image.Image, lang: str = "eng", psm: int = 3) -> list:
+        """Recognized words with confidence, pixel box and a per-page line id"""
+        engine, idle = self._acquire(lang, psm, "")
+        try:
+            return engine.image_to_data(image)
+        finally:
+            idle.put(engine)
+
+    def _acquire(self, lang, psm, whitelist):
+        key = (lang, psm, whitelist)
+        with self.lock:
+            if self.pid != os.getpid():
+                self._reset()
+            if key not in self.idle:
+                self.idle[key] = queue.LifoQueue()
+                self.slots[key] = threading.Semaphore(self.size)
+            idle, slots = self.idle[key], self.slots[key]
+        try:
+            return idle.get_nowait(), idle
+        except queue.Empty:
+            pass
+        # Create up to `size` engines, then wait for one to come back
+        if slots.acquire(blocking=False):
+            try:
+                return self.engine_cls(lang=lang, psm=psm, whitelist=whitelist), idle
+            except Exception:
+                slots.release()
+                raise
+        return idle.get(), idle
+
+
+ocr_pool = OCREnginePool()
+
+
 def extract_text(path):
     if path.endswith(".pdf"):
+        import pdfplumber
         text = ""
         with pdfplumber.open(path) as pdf:
             for page in pdf.pages:
@@ -11,5 +164,4 @@ def extract_text(path):
         return text
     else:
         img = Image.open(path)
-        return pytesseract.image_to_string(img, lang="eng")
-
+        return ocr_pool.image_to_string(img, lang="eng")
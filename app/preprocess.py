@@ -0,0 +1,216 @@
+import io
+import math
+import os
+import numpy as np
+from PIL import Image
+
+# Preprocessing settings - override with env vars
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_MAX_PIXELS = int(os.getenv("OCR_MAX_PIXELS", str(12_000_000)))   # cap per page after scaling
+OCR_MAX_UPSCALE = float(os.getenv("OCR_MAX_UPSCALE", "2.0"))          # small inputs grow at most this much
+
+# Named presets - FORM_TEMPLATES picks one per template.
+# page_inches: long side of what a photo/scan shows (document plus the usual
+#              margin) - estimates its effective DPI when it carries no DPI tag
+# aspect:      long/short side range of such a photo/scan - an untagged image
+#              outside it may show a whole page, so it is shrunk no further than
+#              an A4 page at the target DPI needs
+# denoise:     separable 3x3 median (salt-and-pepper, JPEG speckle)
+# stretch:     (low, high) percentiles mapped to black/white, or None
+# binarize:    None | "otsu" (even lighting) | "adaptive" (glare, shadows)
+PRESETS = {
+    "card": {"page_inches": 5.0, "aspect": (1.51, 1.67), "denoise": True, "stretch": (1, 99),
+             "binarize": "adaptive"},   # ID-1 card, 1.586
+    "document": {"page_inches": 12.0, "aspect": (1.25, 1.55), "denoise": True, "stretch": (1, 99),
+                 "binarize": "otsu"},   # Letter 1.29 to A4 1.41
+    "clean": {"page_inches": 12.0, "aspect": (1.25, 1.55), "denoise": False, "stretch": None, "binarize": None},
+}
+DEFAULT_PRESET = "card"
+A4_INCHES = (8.27, 11.69)
+
+
+def get_preset(name: str) -> dict:
+    return PRESETS.get(name, PRESETS[DEFAULT_PRESET])
+
+
+def render_dpi(width_in: float, height_in: float, dpi: int = OCR_TARGET_DPI) -> float:
+    """Raster DPI for a page of this size - the target, lowered to fit OCR_MAX_PIXELS"""
+    pixels = width_in * height_in * dpi * dpi
+    if pixels > OCR_MAX_PIXELS:
+        dpi *= (OCR_MAX_PIXELS / pixels) ** 0.5
+    return dpi
+
+
+def tagged_dpi(image: Image.Image):
+    """DPI tag when it looks real, else None"""
+    dpi = image.info.get("dpi")
+    try:
+        dpi = float(dpi[0])
+    except (TypeError, ValueError, IndexError):
+        return None
+    return dpi if dpi >= 100 else None  # 72/96 are screen defaults, not scan resolutions
+
+
+def source_dpi(image: Image.Image, page_inches: float) -> float:
+    """DPI tag when it looks real, else estimated from the document's physical size"""
+    return tagged_dpi(image) or max(image.size) / page_inches
+
+
+def resample_scale(image: Image.Image, preset: dict, dpi: int = OCR_TARGET_DPI) -> float:
+    """Factor that brings the image to `dpi`. Without a DPI tag, an image not shaped
+    like the preset's document (a 4:3 photo under a card template may be an A4 form)
+    keeps at least an A4 page's worth of pixels at `dpi`. Growth is capped at OCR_MAX_UPSCALE."""
+    scale = dpi / source_dpi(image, preset["page_inches"])
+    if scale < 1 and tagged_dpi(image) is None:
+        low, high = preset["aspect"]
+        if not low <= max(image.size) / max(1, min(image.size)) <= high:
+            page_pixels = A4_INCHES[0] * A4_INCHES[1] * dpi * dpi
+            scale = max(scale, min(1.0, (page_pixels / (image.width * image.height)) ** 0.5))
+    return min(scale, OCR_MAX_UPSCALE)
+
+
+def pixel_cap(image: Image.Image) -> float:
+    """Largest scale that keeps the image within OCR_MAX_PIXELS"""
+    return (OCR_MAX_PIXELS / (image.width * image.height)) ** 0.5
+
+
+def normalize_resolution(image: Image.Image, preset: dict, dpi: int = OCR_TARGET_DPI) -> Image.Image:
+    """Scale to the target effective DPI - 12 MP scans shrink before any pixel work"""
+    scale = min(resample_scale(image, preset, dpi), pixel_cap(image))
+    if 0.9 <= scale <= 1.25:  # close enough - skip the resample
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if scale < 1:
+        return image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+    return image.resize(size, Image.BICUBIC)
+
+
+def decode_image(contents: bytes, preset: str = DEFAULT_PRESET, full: bool = False,
+                 dpi: int = OCR_TARGET_DPI) -> Image.Image:
+    """Decode an upload, straight at reduced scale where the codec allows it.
+    JPEG draft mode decodes in grayscale, at 1/2, 1/4 or 1/8 size when that still
+    leaves what normalize_resolution keeps - never below what `dpi` needs.
+    `full=True` is for high-detail passes that want every pixel."""
+    image = Image.open(io.BytesIO(contents))
+    if not full and image.format == "JPEG":
+        width, height = image.size
+        scale = min(1.0, resample_scale(image, get_preset(preset), dpi), pixel_cap(image))
+        image.draft("L", (int(width * scale), int(height * scale)))
+        if image.size != (width, height) and "dpi" in image.info:
+            # Keep the DPI tag true to the pixels we actually decoded
+            factor = image.width / width
+            image.info["dpi"] = tuple(d * factor for d in image.info["dpi"])
+    image.load()
+    return image
+
+
+def to_gray(image: Image.Image) -> np.ndarray:
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    if image.mode == "RGB":
+        image = image.convert("L")
+    return np.asarray(image)
+
+
+def _median3(a: np.ndarray, axis: int) -> np.ndarray:
+    """Median of each pixel and its two neighbours along `axis` (edges repeat)"""
+    p = np.pad(a, [(1, 1), (0, 0)] if axis == 0 else [(0, 0), (1, 1)], mode="edge")
+    if axis == 0:
+        lo, mid, hi = p[:-2], p[1:-1], p[2:]
+    else:
+        lo, mid, hi = p[:, :-2], p[:, 1:-1], p[:, 2:]
+    return np.maximum(np.minimum(lo, mid), np.minimum(np.maximum(lo, mid), hi))
+
+
+def denoise(gray: np.ndarray) -> np.ndarray:
+    """Separable 3x3 median - rows then columns, min/max only"""
+    return _median3(_median3(gray, 1), 0)
+
+
+def stretch_contrast(gray: np.ndarray, low: float, high: float) -> np.ndarray:
+    """Map the low/high percentiles to 0/255 through a 256-entry lookup table"""
+    cdf = np.cumsum(np.bincount(gray.ravel(), minlength=256))
+    lo = int(np.searchsorted(cdf, cdf[-1] * low / 100))
+    hi = int(np.searchsorted(cdf, cdf[-1] * high / 100))
+    if hi - lo < 16:  # blank or flat page - leave it alone
+        return gray
+    lut = np.clip((np.arange(256) - lo) * 255.0 / (hi - lo), 0, 255).astype(np.uint8)
+    return lut[gray]
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * np.arange(256))
+    total_weight, total_mean = weight[-1], mean[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weight - mean * total_weight) ** 2 / (weight * (total_weight - weight))
+    if np.isnan(between).all():  # a single gray level - all paper
+        return 0
+    return int(np.nanargmax(between))
+
+
+def binarize_otsu(gray: np.ndarray) -> np.ndarray:
+    return np.where(gray > otsu_threshold(gray), 255, 0).astype(np.uint8)
+
+
+def binarize_adaptive(gray: np.ndarray, dpi: int = OCR_TARGET_DPI, offset: float = 0.1,
+                      min_delta: int = 40) -> np.ndarray:
+    """Local-mean threshold - the background is a box-averaged downscale blown back up,
+    so uneven lighting and glare do not swallow text. Pixels must also sit `min_delta`
+    below it, which keeps paper grain out of flat areas."""
+    block = max(2, dpi // 6)  # ~1/6 inch cells - wider than a glyph stroke
+    image = Image.fromarray(gray)
+    if min(image.size) <= block * 4:  # too small to have a background of its own
+        return binarize_otsu(gray)
+    small = image.reduce(block)
+    background = np.asarray(small.resize(image.size, Image.BILINEAR), dtype=np.int16)
+    gray = gray.astype(np.int16)
+    ink = (gray < background * (1 - offset)) & (background - gray > min_delta)
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+
+def preprocess(image: Image.Image, preset: str = DEFAULT_PRESET, resample: bool = True,
+               dpi: int = OCR_TARGET_DPI) -> Image.Image:
+    """Resolution-normalized grayscale -> denoise -> contrast -> binarize, as array ops.
+    `resample=False` for pages already rasterized at the target DPI."""
+    config = get_preset(preset)
+    if resample:
+        image = normalize_resolution(image, config, dpi)
+    gray = to_gray(image)
+    if config["denoise"]:
+        gray = denoise(gray)
+    if config["stretch"]:
+        gray = stretch_contrast(gray, *config["stretch"])
+    if config["binarize"] == "otsu":
+        gray = binarize_otsu(gray)
+    elif config["binarize"] == "adaptive":
+        gray = binarize_adaptive(gray, dpi)
+    return Image.fromarray(gray)
+
+
+def prepare_region(image: Image.Image, preset: str = DEFAULT_PRESET) -> Image.Image:
+    """Preset pipeline for a small crop already at the wanted DPI. A line-sized
+    crop is evenly lit, so any binarization is a plain Otsu threshold."""
+    config = get_preset(preset)
+    gray = to_gray(image)
+    if config["denoise"]:
+        gray = denoise(gray)
+    if config["stretch"]:
+        gray = stretch_contrast(gray, *config["stretch"])
+    if config["binarize"]:
+        gray = binarize_otsu(gray)
+    return Image.fromarray(gray)
+
+
+def crop_region(image: Image.Image, box: tuple, preset: str = DEFAULT_PRESET,
+                dpi: int = OCR_TARGET_DPI) -> Image.Image:
+    """Fractional (x0, y0, x1, y1) region of a full-resolution image, scaled to `dpi`"""
+    scale = resample_scale(image, get_preset(preset), dpi)
+    x0, y0, x1, y1 = box
+    region = image.crop((int(x0 * image.width), int(y0 * image.height),
+                         math.ceil(x1 * image.width), math.ceil(y1 * image.height)))
+    if not 0.8 <= scale <= 1.25:
+        size = (max(1, round(region.width * scale)), max(1, round(region.height * scale)))
+        region = region.resize(size, Image.BICUBIC if scale > 1 else Image.BILINEAR)
+    return prepare_region(region, preset)
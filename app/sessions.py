@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Session settings - override with env vars
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))          # seconds a result stays downloadable
+SESSION_MAX = int(os.getenv("SESSION_MAX", "1000"))          # sessions kept, least recently used dropped
+SESSION_PDF_BYTES = int(os.getenv("SESSION_PDF_BYTES", str(64 * 1024 * 1024)))   # rendered PDF cache cap
+
+
+class SessionStore:
+    """Extraction results by session id, in memory only. Bounded LRU; an entry
+    expires `ttl` seconds after it was stored. Rendered PDFs are cached on their
+    session per template, under a total byte cap."""
+
+    def __init__(self, size: int = SESSION_MAX, ttl: int = SESSION_TTL, pdf_bytes: int = SESSION_PDF_BYTES):
+        self.size = max(1, size)
+        self.ttl = ttl
+        self.pdf_bytes = pdf_bytes
+        self.entries = OrderedDict()   # id -> {"result", "created", "pdfs": {template: bytes}}
+        self.pdf_total = 0
+        self.lock = threading.Lock()
+        self.counters = {"stored": 0, "expired": 0, "pdf_hits": 0, "pdf_renders": 0}
+
+    def put(self, result: dict) -> str:
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.entries[session_id] = {"result": result, "created": time.time(), "pdfs": {}}
+            self.counters["stored"] += 1
+            while len(self.entries) > self.size:
+                self._drop(next(iter(self.entries)))
+        return session_id
+
+    def get(self, session_id: str):
+        with self.lock:
+            entry = self._entry(session_id)
+            return entry["result"] if entry else None
+
+    def get_pdf(self, session_id: str, template: str):
+        with self.lock:
+            entry = self._entry(session_id)
+            pdf = entry["pdfs"].get(template) if entry else None
+            if pdf is not None:
+                self.counters["pdf_hits"] += 1
+            return pdf
+
+    def put_pdf(self, session_id: str, template: str, pdf: bytes):
+        with self.lock:
+            self.counters["pdf_renders"] += 1
+            entry = self._entry(session_id)
+            if entry is None or len(pdf) > self.pdf_bytes or template in entry["pdfs"]:
+                return
+            # Make room by dropping PDFs of the least recently used sessions - their results stay
+            for other in self.entries.values():
+                if self.pdf_total + len(pdf) <= self.pdf_bytes:
+                    break
+                if other is not entry:
+                    self._clear_pdfs(other)
+            if self.pdf_total + len(pdf) <= self.pdf_bytes:
+                entry["pdfs"][template] = pdf
+                self.pdf_total += len(pdf)
+
+    def stats(self) -> dict:
+        with self.lock:
+            self._expire()
+            return {
+                **self.counters,
+                "sessions": len(self.entries),
+                "pdfs_cached": sum(len(entry["pdfs"]) for entry in self.entries.values()),
+                "pdf_bytes": self.pdf_total,
+                "ttl": self.ttl,
+            }
+
+    def _entry(self, session_id):
+        entry = self.entries.get(session_id)
+        if entry is None:
+            return None
+        if time.time() - entry["created"] > self.ttl:
+            self._drop(session_id)
+            self.counters["expired"] += 1
+            return None
+        self.entries.move_to_end(session_id)
+        return entry
+
+    def _expire(self):
+        now = time.time()
+        for session_id in [k for k, entry in self.entries.items() if now - entry["created"] > self.ttl]:
+            self._drop(session_id)
+            self.counters["expired"] += 1
+
+    def _drop(self, session_id):
+        self._clear_pdfs(self.entries.pop(session_id))
+
+    def _clear_pdfs(self, entry):
+        self.pdf_total -= sum(len(pdf) for pdf in entry["pdfs"].values())
+        entry["pdfs"].clear()
@@ -1,11 +0,0 @@
-import shutil
-import os
-
-UPLOAD_DIR = "uploads"
-
-def save_file(file):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return path
@@ -0,0 +1,128 @@
+"""Micro-benchmark for the regex field extractors on large OCR dumps.
+
+    python -m benchmarks.bench_extraction --docs 50 --pages 20 --compare baseline
+
+--compare loads the extract_* functions from app/main.py at a git revision
+and checks that every field comes out identical before timing both.
+"""
+import argparse
+import ast
+import random
+import re
+import statistics
+import subprocess
+import time
+
+from app import main
+
+FIELDS = ["aadhaar", "pan", "dob", "phone", "pincode", "address"]
+
+WORDS = ["government", "of", "india", "male", "female", "year", "birth", "father",
+         "issue", "date", "signature", "authority", "unique", "identification",
+         "income", "tax", "department", "permanent", "account", "number", "valid"]
+NAMES = ["Rahul Sharma", "Priya Deori", "Amit Kumar Das", "Sunita Devi", "Rajesh Gogoi"]
+LABELS = ["Name", "DOB", "Address", "पता", "जिला", "Aadhaar No", "PAN", "Phone", "PIN"]
+
+
+def random_line(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.35:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 9)))
+    if kind < 0.45:
+        return f"{rng.choice(LABELS)}: {rng.choice(NAMES)}"
+    if kind < 0.55:
+        d, m, y = rng.randint(1, 28), rng.randint(1, 12), rng.randint(1950, 2010)
+        return f"DOB {d:02d}{rng.choice('/-.')}{m:02d}{rng.choice('/-.')}{y}"
+    if kind < 0.62:
+        groups = [str(rng.randint(2000, 9999)), str(rng.randint(1000, 9999)), str(rng.randint(1000, 9999))]
+        if rng.random() < 0.5:
+            groups[0] = groups[1] = rng.choice(["XXXX", "xxxx", "****"])
+        return f"{rng.choice(['Aadhaar', 'आधार', 'No.', ''])} {' '.join(groups)}"
+    if kind < 0.68:
+        letters = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(5))
+        return f"PAN {letters}{rng.randint(1000, 9999)}{rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
+    if kind < 0.74:
+        return f"Mobile {rng.choice('6789')}{rng.randint(100000000, 999999999)}"
+    if kind < 0.82:
+        return f"House {rng.randint(1, 999)}, Ward {rng.randint(1, 40)}, MG Road, Dispur {rng.randint(781000, 781999)}"
+    # OCR noise
+    return "".join(rng.choice("|~'`;:,.-_=il1IoO0 ") for _ in range(rng.randint(5, 40)))
+
+
+def make_dump(rng: random.Random, pages: int, lines_per_page: int = 60) -> str:
+    return "\n".join(random_line(rng) for _ in range(pages * lines_per_page))
+
+
+def load_extractors(ref: str) -> dict:
+    """extract_* functions from app/main.py at a git revision, without importing it"""
+    source = subprocess.check_output(["git", "show", f"{ref}:app/main.py"], text=True)
+    tree = ast.parse(source)
+    tree.body = [node for node in tree.body
+                 if isinstance(node, ast.FunctionDef) and node.name.startswith("extract_")]
+    namespace = {"re": re, "nlp_en": None}
+    exec(compile(tree, f"{ref}:app/main.py", "exec"), namespace)
+    return namespace
+
+
+def run_fields(ns: dict, text: str) -> dict:
+    lines = [line.strip() for line in text.splitlines() if len(line.strip()) > 2]
+    return {
+        "aadhaar": ns["extract_aadhaar"](text),
+        "pan": ns["extract_pan"](text),
+        "dob": ns["extract_dob"](text),
+        "phone": ns["extract_phone"](text),
+        "pincode": ns["extract_pincode"](text),
+        "address": ns["extract_address"](text, lines),
+    }
+
+
+def normalize(fields: dict) -> dict:
+    # The old month-name DOB pattern had a stray capture group and returned a tuple
+    if isinstance(fields["dob"], tuple):
+        fields["dob"] = fields["dob"][0]
+    return fields
+
+
+def time_docs(ns: dict, docs: list) -> list:
+    timings = []
+    for text in docs:
+        start = time.perf_counter()
+        run_fields(ns, text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<10} mean {statistics.mean(timings):8.2f} ms   "
+          f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=20, help="OCR pages per document")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", metavar="GIT_REF", help="check and time against this revision")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_dump(rng, args.pages) for _ in range(args.docs)]
+    size_kb = sum(len(d) for d in docs) / len(docs) / 1024
+    print(f"{args.docs} docs x {args.pages} pages (~{size_kb:.0f} KB of text each)")
+
+    current = vars(main)
+    if args.compare:
+        legacy = load_extractors(args.compare)
+        mismatches = 0
+        for text in docs:
+            old, new = normalize(run_fields(legacy, text)), run_fields(current, text)
+            mismatches += sum(old[f] != new[f] for f in FIELDS)
+        print(f"equivalence vs {args.compare}: {mismatches} mismatched fields")
+        report(args.compare, time_docs(legacy, docs))
+    report("current", time_docs(current, docs))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,76 @@
+"""Per-page OCR latency: pytesseract (process per call) vs warm tesserocr engines.
+
+    python -m benchmarks.bench_ocr --pages 30
+
+Renders small synthetic ID-card images in memory and OCRs each one with every
+backend available here. tesserocr is skipped if it isn't installed.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+from app import main  # noqa: F401 - applies the tesseract_cmd setting
+from app.ocr import PytesseractEngine, TesserocrEngine, tesserocr
+
+LINES = [
+    "GOVERNMENT OF INDIA",
+    "{name}",
+    "DOB: {d:02d}/{m:02d}/{y}",
+    "Address: House {h}, MG Road, Dispur {pin}",
+    "{a1} {a2} {a3}",
+]
+NAMES = ["Rahul Sharma", "Priya Deori", "Amit Kumar Das", "Sunita Devi"]
+
+
+def make_card(rng: random.Random) -> Image.Image:
+    image = Image.new("L", (1000, 630), 255)
+    draw = ImageDraw.Draw(image)
+    values = {
+        "name": rng.choice(NAMES), "d": rng.randint(1, 28), "m": rng.randint(1, 12),
+        "y": rng.randint(1950, 2010), "h": rng.randint(1, 999), "pin": rng.randint(781000, 781999),
+        "a1": rng.randint(2000, 9999), "a2": rng.randint(1000, 9999), "a3": rng.randint(1000, 9999),
+    }
+    for i, line in enumerate(LINES):
+        draw.text((60, 60 + i * 100), line.format(**values), fill=0, font_size=36)
+    return image
+
+
+def bench(engine, cards: list) -> tuple:
+    start = time.perf_counter()
+    engine.image_to_string(cards[0])
+    cold = (time.perf_counter() - start) * 1000
+    timings = []
+    for card in cards:
+        start = time.perf_counter()
+        engine.image_to_string(card)
+        timings.append((time.perf_counter() - start) * 1000)
+    return cold, sorted(timings)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cards = [make_card(rng) for _ in range(args.pages)]
+    backends = [PytesseractEngine]
+    if tesserocr:
+        backends.append(TesserocrEngine)
+    else:
+        print("tesserocr not installed - benchmarking pytesseract only")
+
+    for engine_cls in backends:
+        cold, timings = bench(engine_cls(lang=args.lang, psm=6), cards)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{engine_cls.name:<12} first {cold:8.1f} ms   mean {statistics.mean(timings):8.1f} ms   "
+              f"p50 {statistics.median(timings):8.1f} ms   p95 {p95:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,185 @@
+"""Synthetic ID-card corpus with ground truth for end-to-end benchmarks.
+
+    python -m benchmarks.corpus --out bench_corpus --count 60 --noise 0.3 --skew 2 --masked 0.5 --hindi
+
+Writes Aadhaar / PAN / voter-ID style card images (PNG/JPEG) and multi-page
+PDFs (scanned or with a text layer) plus a manifest.jsonl with the true field
+values for each file.
+"""
+import argparse
+import io
+import json
+import os
+import random
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageChops
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+FIRST_NAMES = ["Rahul", "Priya", "Amit", "Sunita", "Rajesh", "Anjali", "Vikram", "Pooja", "Bikash", "Meena"]
+LAST_NAMES = ["Sharma", "Deori", "Kumar Das", "Devi", "Gogoi", "Singh", "Patel", "Baruah", "Verma", "Nath"]
+STREETS = ["MG Road", "Station Road", "GS Road", "Zoo Road", "AT Road", "Beltola Road"]
+TOWNS = [("Dispur", "Kamrup"), ("Jorhat", "Jorhat"), ("Tezpur", "Sonitpur"), ("Dibrugarh", "Dibrugarh")]
+DEVANAGARI_FONTS = [
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf",
+    "/usr/share/fonts/truetype/fonts-deva-extra/chandas1-2.ttf",
+    r"C:\Windows\Fonts\mangal.ttf",
+    r"C:\Windows\Fonts\Nirmala.ttf",
+]
+CARD_SIZE = (1300, 640)
+
+
+def find_devanagari_font():
+    return next((path for path in DEVANAGARI_FONTS if os.path.exists(path)), None)
+
+
+def random_person(rng: random.Random, masked: bool) -> dict:
+    town, district = rng.choice(TOWNS)
+    pincode = str(rng.randint(781000, 788999))
+    digits = [str(rng.randint(2000, 9999)), str(rng.randint(1000, 9999)), str(rng.randint(1000, 9999))]
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return {
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "dob": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1950, 2008)}",
+        "address": f"House {rng.randint(1, 999)}, {rng.choice(STREETS)}, {town}, Dist {district}, {pincode}",
+        "pincode": pincode,
+        "aadhaar": " ".join(["XXXX", "XXXX", digits[2]] if masked else digits),
+        "pan": "".join(rng.choice(letters) for _ in range(5)) + str(rng.randint(1000, 9999)) + rng.choice(letters),
+        "phone": f"{rng.choice('6789')}{rng.randint(100000000, 999999999)}",
+    }
+
+
+def card_lines(doc_type: str, person: dict, hindi: bool) -> tuple:
+    """(text, is_hindi) lines as printed on the card, and the fields it truly carries"""
+    if doc_type == "aadhaar":
+        lines = [("GOVERNMENT OF INDIA", False), (person["full_name"], False),
+                 (f"DOB: {person['dob']}", False), (f"Address: {person['address']}", False),
+                 (f"Mobile: {person['phone']}", False), (person["aadhaar"], False)]
+        if hindi:
+            lines.insert(1, ("भारत सरकार", True))
+            lines.insert(4, (f"पता: {person['address']}", True))
+        truth = ["full_name", "dob", "address", "aadhaar", "phone"]
+    elif doc_type == "pan":
+        lines = [("INCOME TAX DEPARTMENT", False), (person["full_name"], False),
+                 (f"Date of Birth {person['dob']}", False), ("Permanent Account Number", False),
+                 (person["pan"], False)]
+        if hindi:
+            lines.insert(1, ("आयकर विभाग", True))
+        truth = ["full_name", "dob", "pan"]
+    else:
+        lines = [("ELECTION COMMISSION OF INDIA", False), (f"Name: {person['full_name']}", False),
+                 (f"Date of Birth: {person['dob']}", False), (f"Address: {person['address']}", False)]
+        if hindi:
+            lines.insert(2, (f"जिला: {person['address'].split('Dist ')[1]}", True))
+        truth = ["full_name", "dob", "address"]
+    return lines, {k: person[k] for k in truth}
+
+
+def render_card(lines: list, font_size: int, hindi_font) -> Image.Image:
+    image = Image.new("RGB", CARD_SIZE, (250, 250, 245))
+    draw = ImageDraw.Draw(image)
+    latin = ImageFont.load_default(size=font_size)
+    deva = ImageFont.truetype(hindi_font, font_size) if hindi_font else None
+    y = 40
+    for text, is_hindi in lines:
+        if is_hindi and deva is None:
+            continue
+        draw.text((50, y), text, fill=(20, 20, 20), font=deva if is_hindi else latin)
+        y += int(font_size * 1.8)
+    return image
+
+
+def degrade(image: Image.Image, rng: random.Random, noise: float, skew: float) -> Image.Image:
+    """Scanner/phone-camera artefacts: rotation, blur and grain"""
+    if skew:
+        image = image.rotate(rng.uniform(-skew, skew), resample=Image.BICUBIC, expand=True,
+                             fillcolor=(255, 255, 255))
+    if noise:
+        image = image.filter(ImageFilter.GaussianBlur(radius=noise * 1.5))
+        grain = Image.effect_noise(image.size, 40 * noise).convert("RGB")
+        image = ImageChops.add(image, grain, scale=1.0, offset=-128)
+    return image
+
+
+def write_pdf(pages: list, path: str, text_layer: list = None):
+    """Scanned PDF (page images) or, with `text_layer`, a digital PDF with real text"""
+    c = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    for n, page in enumerate(pages):
+        if text_layer:
+            y = height - 80
+            for text, is_hindi in text_layer[n]:
+                if not is_hindi:  # Helvetica has no Devanagari glyphs
+                    c.drawString(60, y, text)
+                    y -= 24
+        else:
+            buf = io.BytesIO()
+            page.save(buf, "PNG")
+            buf.seek(0)
+            c.drawImage(ImageReader(buf), 40, height - 40 - page.height * 0.5,
+                        width=page.width * 0.5, height=page.height * 0.5)
+        c.showPage()
+    c.save()
+
+
+FILLER = [("APPLICATION FOR GOVERNMENT SERVICES", False),
+          ("Please attach self-attested copies of identity proof.", False),
+          ("Declaration: the information given above is true to the best of my knowledge.", False)]
+
+
+def generate(out: str, count: int, seed: int = 0, noise: float = 0.0, skew: float = 0.0,
+             masked: float = 0.0, hindi: bool = False, pdf_share: float = 0.3, pdf_pages: int = 3,
+             font_size: int = 34) -> str:
+    rng = random.Random(seed)
+    hindi_font = find_devanagari_font() if hindi else None
+    if hindi and not hindi_font:
+        print("⚠️ No Devanagari font found - Hindi lines are left out")
+    os.makedirs(out, exist_ok=True)
+    manifest = os.path.join(out, "manifest.jsonl")
+    with open(manifest, "w", encoding="utf-8") as f:
+        for i in range(count):
+            doc_type = rng.choice(["aadhaar", "pan", "voter"])
+            person = random_person(rng, masked=rng.random() < masked)
+            lines, truth = card_lines(doc_type, person, hindi)
+            card = degrade(render_card(lines, font_size, hindi_font), rng, noise, skew)
+
+            if rng.random() < pdf_share:
+                digital = rng.random() < 0.5
+                kind = "pdf_digital" if digital else "pdf_scan"
+                filler = render_card(FILLER, font_size, None)
+                pages = [card] + [filler] * (pdf_pages - 1)
+                name = f"{i:04d}_{doc_type}.pdf"
+                write_pdf(pages, os.path.join(out, name), [lines] + [FILLER] * (pdf_pages - 1) if digital else None)
+            else:
+                kind = rng.choice(["png", "jpg"])
+                name = f"{i:04d}_{doc_type}.{kind}"
+                card.save(os.path.join(out, name), **({"quality": 85} if kind == "jpg" else {}))
+
+            f.write(json.dumps({"file": name, "type": doc_type, "kind": kind, "truth": truth},
+                               ensure_ascii=False) + "\n")
+    return manifest
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="bench_corpus")
+    parser.add_argument("--count", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.0, help="0 (clean) .. 1 (heavy blur and grain)")
+    parser.add_argument("--skew", type=float, default=0.0, help="max rotation in degrees")
+    parser.add_argument("--masked", type=float, default=0.0, help="share of masked Aadhaar numbers")
+    parser.add_argument("--hindi", action="store_true", help="add Devanagari lines (needs a Devanagari font)")
+    parser.add_argument("--pdf-share", type=float, default=0.3, help="share of documents written as PDFs")
+    parser.add_argument("--pdf-pages", type=int, default=3)
+    args = parser.parse_args()
+
+    manifest = generate(args.out, args.count, args.seed, args.noise, args.skew, args.masked,
+                        args.hindi, args.pdf_share, args.pdf_pages)
+    print(f"✅ {args.count} documents -> {manifest}")
+
+
+if __name__ == "__main__":
+    main_cli()
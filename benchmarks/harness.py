@@ -0,0 +1,201 @@
+"""End-to-end benchmark: throughput, latency percentiles, peak RSS and per-field accuracy.
+
+    python -m benchmarks.corpus --out bench_corpus --count 60 --noise 0.3 --masked 0.5
+    python -m benchmarks.harness --corpus bench_corpus --mode inprocess --concurrency 4
+    python -m benchmarks.harness --corpus bench_corpus --mode server --workers 2 --out report.json
+
+inprocess drives app.main.process_upload directly; server starts uvicorn on a
+local port and posts every file to /process. The result cache is disabled
+unless --cache is given, so repeated runs measure real OCR work.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+FIELDS = ["full_name", "dob", "address", "aadhaar", "pan", "phone"]
+
+
+def load_corpus(corpus: str) -> list:
+    with open(os.path.join(corpus, "manifest.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def field_correct(field: str, truth: str, value: str) -> bool:
+    value = value if isinstance(value, str) else ""
+    if field == "address":
+        # Pincode must survive and most of the address words must be there
+        words = re.findall(r"\w+", truth.lower())
+        found = set(re.findall(r"\w+", value.lower()))
+        return truth.rsplit(" ", 1)[-1] in value and sum(w in found for w in words) >= 0.8 * len(words)
+    if field == "dob":
+        return re.sub(r"[/\-.]", "/", value.strip()) == truth
+    if field == "full_name":
+        return " ".join(value.split()).casefold() == truth.casefold()
+    return re.sub(r"\s", "", value).upper() == re.sub(r"\s", "", truth).upper()
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+def peak_rss_mb(children: bool = False):
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def template_for(entry: dict, template: str) -> str:
+    return entry["type"] if template == "auto" else template
+
+
+async def run_inprocess(corpus: str, entries: list, args) -> list:
+    from app import main
+    from app.cache import ResultCache
+    if not args.cache:
+        main.result_cache = ResultCache(size=0, directory="")
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def one(entry):
+        with open(os.path.join(corpus, entry["file"]), "rb") as f:
+            contents = f.read()
+        async with slots:
+            start = time.perf_counter()
+            try:
+                result = await main.process_upload(contents, entry["file"], template_for(entry, args.template), args.full)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            return time.perf_counter() - start, entry, result
+
+    try:
+        return await asyncio.gather(*(one(entry) for entry in entries))
+    finally:
+        main.engine.executor.shutdown(wait=True)
+
+
+def post_file(url: str, path: str) -> dict:
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as f:
+        contents = f.read()
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+            f"filename=\"{os.path.basename(path)}\"\r\nContent-Type: application/octet-stream\r\n\r\n").encode()
+    body += contents + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(url, data=body, method="POST",
+                                     headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    try:
+        with urllib.request.urlopen(request, timeout=600) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b'{"status": "error"}')
+
+
+def run_server(corpus: str, entries: list, args) -> list:
+    env = dict(os.environ)
+    if not args.cache:
+        env["OCR_CACHE_SIZE"] = "0"
+        env["OCR_CACHE_DIR"] = ""
+    base = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"], env=env)
+    try:
+        deadline = time.time() + 120
+        while True:
+            try:
+                urllib.request.urlopen(f"{base}/health", timeout=2).read()
+                break
+            except OSError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not come up")
+                time.sleep(0.5)
+
+        def one(entry):
+            url = f"{base}/process?template={template_for(entry, args.template)}&full={str(args.full).lower()}"
+            start = time.perf_counter()
+            try:
+                result = post_file(url, os.path.join(corpus, entry["file"]))
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            return time.perf_counter() - start, entry, result
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            return list(pool.map(one, entries))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(runs: list, wall: float, rss: dict) -> dict:
+    latencies = sorted(latency for latency, _, _ in runs)
+    correct, total = {}, {}
+    errors = 0
+    for _, entry, result in runs:
+        if result.get("status") != "success":
+            errors += 1
+        form = result.get("filled_form") or {}
+        for field, truth in entry["truth"].items():
+            if field in form:
+                total[field] = total.get(field, 0) + 1
+                correct[field] = correct.get(field, 0) + field_correct(field, truth, form[field])
+    return {
+        "documents": len(runs),
+        "errors": errors,
+        "wall_seconds": round(wall, 2),
+        "throughput_docs_per_s": round(len(runs) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+        },
+        "peak_rss_mb": rss,
+        "accuracy": {f: round(correct[f] / total[f], 3) for f in FIELDS if total.get(f)},
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="bench_corpus")
+    parser.add_argument("--mode", choices=["inprocess", "server"], default="inprocess")
+    parser.add_argument("--template", default="auto", help="form template, or auto = per document type")
+    parser.add_argument("--concurrency", type=int, default=4, help="documents in flight")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--full", action="store_true", help="read every PDF page (no early exit)")
+    parser.add_argument("--cache", action="store_true", help="keep the OCR result cache on")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (server mode)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out", help="also write the report as JSON here")
+    args = parser.parse_args()
+
+    entries = load_corpus(args.corpus) * args.repeat
+    start = time.perf_counter()
+    if args.mode == "inprocess":
+        runs = asyncio.run(run_inprocess(args.corpus, entries, args))
+    else:
+        runs = run_server(args.corpus, entries, args)
+    wall = time.perf_counter() - start
+
+    report = summarize(runs, wall, {"self": peak_rss_mb(), "children": peak_rss_mb(children=True)})
+    report.update({"mode": args.mode, "template": args.template, "concurrency": args.concurrency})
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -16,6 +16,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const docInfo = document.getElementById('docInfo');
     const output = document.getElementById('output');
 
+    const API_BASE = 'http://127.0.0.1:8000';
     let currentSessionId = '';
     let currentResult = null;
     let currentTemplate = 'standard';
@@ -130,7 +131,7 @@ document.addEventListener('DOMContentLoaded', function() {
             formData.append('file', file);
             formData.append('template', currentTemplate);
 
-            const response = await fetch('http://127.0.0.1:8000/process', {
+            const response = await fetch(`${API_BASE}/jobs?template=${currentTemplate}`, {
                 method: 'POST',
                 body: formData
             });
@@ -140,11 +141,11 @@ document.addEventListener('DOMContentLoaded', function() {
             }
 
             const text = await response.text();
-            const data = JSON.parse(text);
+            const data = await waitForJob(JSON.parse(text));
 
             if (data.status === 'success') {
                 currentResult = data;
-                currentSessionId = `doc_${Date.now()}`;
+                currentSessionId = data.session_id;
                 fillFields(data.filled_form);
                 showDocInfo(data);
                 resultsSection.style.display = 'block';
@@ -165,6 +166,40 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Follow job progress over Server-Sent Events, then fetch the final result
+    function waitForJob(job) {
+        return new Promise(resolve => {
+            const events = new EventSource(`${API_BASE}${job.events_url}`);
+            const finish = async () => {
+                events.close();
+                // The stream can drop while the job still runs - poll until it ends
+                let state = {};
+                for (let failures = 0; failures < 10;) {
+                    try {
+                        const res = await fetch(`${API_BASE}${job.status_url}`);
+                        state = await res.json();
+                        if (!res.ok || ['done', 'error'].includes(state.status)) break;
+                        if (state.progress?.pages_total) {
+                            showStatus(`🔍 Reading page ${state.progress.pages_done}/${state.progress.pages_total}...`, 'loading');
+                        }
+                        failures = 0;
+                    } catch (err) {
+                        failures++;  // network blip - try again, give up after 10 in a row
+                    }
+                    await new Promise(r => setTimeout(r, 1000));
+                }
+                resolve(state.result || {status: 'error', message: state.message || 'Lost contact with the job'});
+            };
+            events.addEventListener('page', e => {
+                const d = JSON.parse(e.data);
+                showStatus(`🔍 Reading page ${d.pages_done}/${d.pages_total} (${d.source === 'ocr' ? 'OCR' : 'text layer'})...`, 'loading');
+            });
+            events.addEventListener('extracting', () => showStatus('🧠 Extracting fields...', 'loading'));
+            events.addEventListener('done', finish);
+            events.addEventListener('error', finish);
+        });
+    }
+
     function fillFields(data) {
         dynamicFieldsContainer.querySelectorAll('.field-value').forEach(field => {
             const key = field.dataset.field;
@@ -188,7 +223,7 @@ document.addEventListener('DOMContentLoaded', function() {
             showStatus('No results to download!', 'error');
             return;
         }
-        window.open(`http://127.0.0.1:8000/download/${currentSessionId}?template=${currentTemplate}`, '_blank');
+        window.open(`${API_BASE}/download/${currentSessionId}?template=${currentTemplate}`, '_blank');
         showStatus('📥 PDF downloading...', 'success');
     }
 
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, Rejected
+
+
+def test_timed_out_head_waiter_unblocks_smaller_ones():
+    async def scenario():
+        controller = AdmissionController(max_docs=4, max_pages=10, queue_size=4, timeout=0.05)
+        async with controller.admit(5):
+            big = asyncio.ensure_future(controller.admit(8).__aenter__())
+            await asyncio.sleep(0)
+            small_admitted = asyncio.Event()
+
+            async def small():
+                async with controller.admit(1):
+                    small_admitted.set()
+
+            small_task = asyncio.ensure_future(small())
+            with pytest.raises(Rejected) as rejected:
+                await big
+            assert rejected.value.status == 503
+            # Only the 8-page document was blocked - the 1-page one behind it fits now
+            await asyncio.wait_for(small_admitted.wait(), timeout=0.01)
+            await small_task
+        assert controller.docs == 0 and controller.pages == 0 and not controller.waiters
+
+    asyncio.run(scenario())
+
+
+def test_background_work_waits_past_deadline_and_full_queue():
+    async def scenario():
+        controller = AdmissionController(max_docs=1, queue_size=0, timeout=0.01)
+        async with controller.admit():
+            with pytest.raises(Rejected):
+                async with controller.admit():
+                    pass
+            waiting = asyncio.ensure_future(controller.admit(deadline=False).__aenter__())
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+        await waiting
+        assert controller.docs == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,23 @@
+import asyncio
+
+from app.jobs import Job
+
+
+def test_follow_yields_keepalives_while_quiet():
+    async def scenario():
+        job = Job({})
+        stages = []
+
+        async def read():
+            async for event in job.follow(idle=0.02):
+                stages.append(event and event["stage"])
+
+        reader = asyncio.ensure_future(read())
+        await asyncio.sleep(0.07)
+        job.finish("done", {})
+        await reader
+        return stages
+
+    stages = asyncio.run(scenario())
+    assert stages[0] == "queued" and stages[-1] == "done"
+    assert stages.count(None) >= 2
@@ -0,0 +1,52 @@
+import io
+
+from PIL import Image
+
+from app import preprocess
+from app.preprocess import A4_INCHES, OCR_TARGET_DPI, decode_image, get_preset, normalize_resolution
+
+A4_PIXELS = A4_INCHES[0] * A4_INCHES[1] * OCR_TARGET_DPI ** 2
+
+
+def normalized(size, preset):
+    return normalize_resolution(Image.new("L", size, 255), get_preset(preset)).size
+
+
+def test_untagged_4x3_photo_under_card_shrinks_to_an_a4_page():
+    for size in [(4000, 3000), (4032, 3024), (3000, 4000)]:
+        width, height = normalized(size, "card")
+        assert width * height < size[0] * size[1]
+        assert width * height >= 0.99 * A4_PIXELS
+
+
+def test_card_shaped_photo_shrinks_to_card_resolution():
+    assert normalized((4000, 2500), "card") == (1500, 938)
+
+
+def test_dpi_tag_is_trusted():
+    image = Image.new("L", (4000, 3000), 255)
+    image.info["dpi"] = (600, 600)
+    assert normalize_resolution(image, get_preset("card")).size == (2000, 1500)
+
+
+def test_upscale_is_capped():
+    assert normalized((5, 5), "card") == (10, 10)
+    assert normalized((800, 600), "document") == (1600, 1200)
+
+
+def jpeg(size, **info):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "white").save(buffer, "JPEG", **info)
+    return buffer.getvalue()
+
+
+def test_draft_decode_reduces_shape_mismatched_photo():
+    image = decode_image(jpeg((8000, 6000)), "card")
+    assert image.mode == "L"
+    assert image.size == (4000, 3000)
+    assert image.width * image.height >= A4_PIXELS
+
+
+def test_draft_decode_honors_pixel_cap(monkeypatch):
+    monkeypatch.setattr(preprocess, "OCR_MAX_PIXELS", 3_000_000)
+    assert decode_image(jpeg((4000, 3000), dpi=(300, 300)), "document").size == (2000, 1500)
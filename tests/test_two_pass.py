@@ -0,0 +1,47 @@
+from PIL import Image
+
+from app import main
+from app.ocr import ocr_pool
+
+
+def word(text, left, line):
+    return {"text": text, "conf": 90.0, "left": left, "top": line * 40, "width": 60, "height": 30,
+            "line": (1, 1, line)}
+
+
+def fake_ocr(monkeypatch, seen):
+    words = [word("Aadhaar:", 10, 1), word("23O4", 90, 1), word("PAN", 10, 2), word("1234", 90, 2)]
+
+    def image_to_data(image, lang=None, psm=None):
+        seen.append(image.size)
+        return words
+
+    monkeypatch.setattr(main, "OCR_MODE", "two_pass")
+    monkeypatch.setattr(ocr_pool, "image_to_data", image_to_data)
+    monkeypatch.setattr(ocr_pool, "image_to_string", lambda image, **kw: "ABCDE1234F")
+
+
+def test_only_template_fields_are_reread(monkeypatch):
+    fake_ocr(monkeypatch, [])
+    boxes = []
+
+    def hires(box):
+        boxes.append(box)
+        return Image.new("L", (100, 20), 255)
+
+    text = main.ocr_two_pass(Image.new("L", (400, 200), 255), hires, "eng", fields=["pan"], dpi=main.OCR_FAST_DPI)
+    assert len(boxes) == 1 and "PAN: ABCDE1234F" in text
+    # Without a field list the Aadhaar regions are re-read too
+    main.ocr_two_pass(Image.new("L", (400, 200), 255), hires, "eng", dpi=main.OCR_FAST_DPI)
+    assert len(boxes) > 2
+
+
+def test_pdf_pages_render_at_fast_dpi(monkeypatch):
+    import fitz
+    seen = []
+    fake_ocr(monkeypatch, seen)
+    with fitz.open() as doc:
+        doc.new_page(width=595, height=842)  # A4 in points
+        page_pdf = doc.tobytes()
+    main.ocr_pdf_page(page_pdf, "document", "eng", ["pan"])
+    assert seen == [(round(595 / 72 * main.OCR_FAST_DPI), round(842 / 72 * main.OCR_FAST_DPI))]
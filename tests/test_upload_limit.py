@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+from app.admission import UploadLimit
+
+LIMIT = 1024 * 1024
+BOUNDARY = "limit-test"
+
+
+def build_app():
+    app = FastAPI()
+
+    # Same shape as app.main: an http middleware (BaseHTTPMiddleware) under the cap
+    @app.middleware("http")
+    async def passthrough(request, call_next):
+        return await call_next(request)
+
+    @app.post("/process")
+    async def process(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadLimit, max_bytes=LIMIT)
+    return app
+
+
+def multipart_chunks(size: int, chunk: int = 64 * 1024):
+    yield (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="x.pdf"\r\n'
+           f"Content-Type: application/pdf\r\n\r\n").encode()
+    for start in range(0, size, chunk):
+        yield b"0" * min(chunk, size - start)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def post(content, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/process", content=content, headers={
+                "Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})})
+    return asyncio.run(run())
+
+
+def streamed(size: int):
+    async def body():
+        for part in multipart_chunks(size):
+            yield part
+    return body()
+
+
+def test_streamed_body_over_cap_without_content_length_gets_413():
+    response = post(streamed(3 * LIMIT))
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    assert response.json()["status"] == "error"
+
+
+def test_declared_content_length_over_cap_gets_413():
+    response = post(b"".join(multipart_chunks(2 * LIMIT)))
+    assert response.status_code == 413
+
+
+def test_streamed_body_under_cap_passes():
+    response = post(streamed(LIMIT // 2))
+    assert response.status_code == 200
+    assert response.json() == {"size": LIMIT // 2}